@@ -0,0 +1,59 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an unbounded COUNT(*).
+
+    Unfiltered lists on PostgreSQL use the planner's row estimate from
+    pg_class; everything else is counted up to COUNT_LIMIT rows, so pages
+    past that limit are not reachable from the page links.
+    """
+    COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self._estimate_rows(queryset)
+            if estimate > self.COUNT_LIMIT:
+                return estimate
+        return queryset.order_by()[:self.COUNT_LIMIT].count()
+
+    def _estimate_rows(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin defaults for tables with millions of rows: estimated counts,
+    no second COUNT(*) for the "show all" link, and prefix searches that can
+    use the btree indexes instead of ``icontains`` table scans.
+    Searches are case-sensitive ``startswith`` over ``search_fields``.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term or not self.search_fields:
+            return queryset, False
+
+        query = Q()
+        for field in self.search_fields:
+            query |= Q(**{f'{field}__startswith': search_term})
+        return queryset.filter(query), False
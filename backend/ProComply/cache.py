@@ -0,0 +1,165 @@
+"""
+Two-tier cache with per-engineer versioned namespaces.
+
+Every key for an engineer embeds that engineer's generation counter, which
+lives in the shared ``default`` cache. A write bumps the counter, so all of
+the engineer's cached summaries, lists, profiles and reports become
+unreachable at once without scanning keys; stale entries simply age out.
+
+Because a versioned key never changes meaning, values can also be kept in
+the per-process ``local`` tier. Only the generation lookup has to go to the
+shared tier.
+
+Without a shared tier each worker would keep its own generations and serve
+another worker's stale data, so nothing is cached unless
+``ENGINEER_CACHE_ENABLED`` is set (it defaults to ``bool(CACHE_SHARED_URL)``).
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from monitoring import metrics
+
+ENGINEER_CACHE_TIMEOUT = 60 * 15
+
+_MISSING = object()
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """LocMemCache that counts hits, misses and culled entries in monitoring.metrics"""
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.metrics_prefix = f'cache.{name}'
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            metrics.increment(f'{self.metrics_prefix}.misses')
+            return default
+        metrics.increment(f'{self.metrics_prefix}.hits')
+        return value
+
+    def _cull(self):
+        before = len(self._cache)
+        super()._cull()
+        metrics.increment(f'{self.metrics_prefix}.evictions', before - len(self._cache))
+
+
+def _tiers():
+    local = caches['local']
+    shared = caches['default']
+    return local, (shared if settings.CACHE_SHARED_URL else None)
+
+
+def _generation_key(engineer_id):
+    return f'generation:engineer:{engineer_id}'
+
+
+def _modified_key(engineer_id):
+    return f'modified:engineer:{engineer_id}'
+
+
+def _fresh_generation():
+    # Time-based so a counter lost to eviction never reuses an old number
+    return time.time_ns() // 1000
+
+
+def get_engineer_generation(engineer_id):
+    shared = caches['default']
+    generation = shared.get(_generation_key(engineer_id))
+    if generation is None:
+        shared.add(_generation_key(engineer_id), _fresh_generation(), None)
+        generation = shared.get(_generation_key(engineer_id))
+    return generation
+
+
+def bump_engineer_generation(engineer_id):
+    """
+    Invalidate every cached value for an engineer once the current
+    transaction commits. Bumping earlier would let a concurrent read cache
+    pre-commit data under the new generation.
+    """
+    transaction.on_commit(lambda: _bump_generation(engineer_id))
+
+
+def _bump_generation(engineer_id):
+    shared = caches['default']
+    try:
+        shared.incr(_generation_key(engineer_id))
+    except ValueError:
+        shared.set(_generation_key(engineer_id), _fresh_generation(), None)
+    shared.set(_modified_key(engineer_id), int(time.time()), None)
+
+
+def get_engineer_validators(engineer_id):
+    """(generation, last write as a Unix timestamp or None) for conditional requests"""
+    shared = caches['default']
+    values = shared.get_many([_generation_key(engineer_id), _modified_key(engineer_id)])
+    generation = values.get(_generation_key(engineer_id))
+    if generation is None:
+        generation = get_engineer_generation(engineer_id)
+    return generation, values.get(_modified_key(engineer_id))
+
+
+def engineer_cache_key(engineer_id, name, *parts, generation=None):
+    if generation is None:
+        generation = get_engineer_generation(engineer_id)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'engineer:{engineer_id}:{generation}:{name}:{suffix}'
+
+
+def get_for_engineer(engineer_id, name, *parts, generation=None):
+    """Cached value for an engineer, or None on a miss"""
+    if not settings.ENGINEER_CACHE_ENABLED:
+        return None
+    key = engineer_cache_key(engineer_id, name, *parts, generation=generation)
+    local, shared = _tiers()
+
+    value = local.get(key)
+    if value is None and shared is not None:
+        value = shared.get(key)
+        metrics.increment(f"cache.shared.{'misses' if value is None else 'hits'}")
+        if value is not None:
+            local.set(key, value, ENGINEER_CACHE_TIMEOUT)
+    return value
+
+
+def set_for_engineer(engineer_id, name, value, *parts, timeout=ENGINEER_CACHE_TIMEOUT, generation=None):
+    if not settings.ENGINEER_CACHE_ENABLED:
+        return
+    key = engineer_cache_key(engineer_id, name, *parts, generation=generation)
+    local, shared = _tiers()
+    local.set(key, value, timeout)
+    if shared is not None:
+        shared.set(key, value, timeout)
+
+
+def cached_for_engineer(engineer_id, name, build, *parts, timeout=ENGINEER_CACHE_TIMEOUT):
+    """Return the cached value, building and storing it on a miss"""
+    if not settings.ENGINEER_CACHE_ENABLED:
+        return build()
+    # Store under the generation read before building, so a write that
+    # commits mid-build leaves the value unreachable rather than stale
+    generation = get_engineer_generation(engineer_id)
+    value = get_for_engineer(engineer_id, name, *parts, generation=generation)
+    if value is None:
+        value = build()
+        set_for_engineer(engineer_id, name, value, *parts, timeout=timeout, generation=generation)
+    return value
+
+
+aget_for_engineer = sync_to_async(get_for_engineer)
+aset_for_engineer = sync_to_async(set_for_engineer)
+
+
+def get_cache_stats():
+    local, shared = _tiers()
+    return {
+        'local_entries': len(local._cache),
+        'local_max_entries': local._max_entries,
+        'shared_backend': settings.CACHES['default']['BACKEND'] if shared is not None else None,
+    }
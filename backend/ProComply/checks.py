@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Throttle buckets live in the default cache, which is per process without CACHE_SHARED_URL"""
+    if settings.DEBUG or settings.CACHE_SHARED_URL:
+        return []
+    return [
+        Warning(
+            'Throttle token buckets are kept per worker process because CACHE_SHARED_URL is not set.',
+            hint='Each worker allows the full rate. Set CACHE_SHARED_URL when running more than one worker.',
+            id='ProComply.W001',
+        )
+    ]
@@ -0,0 +1,53 @@
+import functools
+from datetime import date
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import get_engineer_validators
+
+
+def conditional_on_engineer(name, depends_on_today=False):
+    """
+    ETag/Last-Modified for a DRF view method whose response depends only on
+    the requesting engineer's data. Validators come from the engineer's cache
+    generation, so a matching If-None-Match is answered with a 304 before
+    any serialization or aggregate queries run.
+
+    Views whose body also changes with the date (license status, default
+    year) pass ``depends_on_today``: today's date joins the ETag and no
+    Last-Modified is sent, since the body can change without a write.
+
+    With ``ENGINEER_CACHE_ENABLED`` off the generations are not shared
+    between workers, so no validators are sent at all.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.ENGINEER_CACHE_ENABLED:
+                return handler(view, request, *args, **kwargs)
+
+            generation, modified = get_engineer_validators(request.user.pk)
+            etag = f'"{name}-{request.user.pk}-{generation}"'
+            if depends_on_today:
+                etag = f'"{name}-{request.user.pk}-{generation}-{date.today().isoformat()}"'
+                modified = None
+
+            not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+            if not_modified is None:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            else:
+                response = not_modified
+
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified)
+            # Let browsers keep the body but revalidate on every use
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization', 'Cookie'])
+            return response
+        return wrapper
+    return decorator
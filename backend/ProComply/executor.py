@@ -0,0 +1,33 @@
+# ProComply/executor.py
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor():
+    """Bounded pool shared by async views for blocking SDK calls"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BLOCKING_IO_MAX_WORKERS,
+                thread_name_prefix='blocking-io'
+            )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking network call (Firebase, Brevo, Cloudinary) off the event loop.
+
+    These calls never touch the ORM, so they use the bounded pool instead of
+    sync_to_async's single thread-sensitive executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,219 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+_pinned = ContextVar('db_pinned_to_primary', default=False)
+_lag_lock = threading.Lock()
+_lag_checks = {}
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def get_replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+@contextmanager
+def use_primary():
+    """Route every read in this context to the primary"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def replica_safe(view):
+    """
+    Mark a view (function or class) whose POSTs only read, such as a
+    what-if calculation. Its requests are neither pinned to the primary nor
+    start the engineer's sticky window.
+    """
+    view.replica_safe = True
+    return view
+
+
+def may_write(request):
+    """Unsafe methods may write, unless the view they resolve to is replica_safe"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return False
+    try:
+        view = resolve(request.path_info, getattr(request, 'urlconf', None)).func
+    except Resolver404:
+        return True
+    # Class-based views carry the marker on the class
+    return not (getattr(view, 'replica_safe', False) or getattr(getattr(view, 'view_class', None), 'replica_safe', False))
+
+
+def measure_replica_lag(alias):
+    """Replication delay in seconds, or None when the replica is unreachable"""
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            connection.ensure_connection()
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except Exception as e:
+        logger.warning(f"Replica {alias} lag check failed: {str(e)}")
+        return None
+
+
+def replica_is_healthy(alias):
+    """Lag guard, re-checked at most every REPLICA_LAG_CHECK_INTERVAL seconds per process"""
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag_checks.get(alias)
+    if checked is None or now - checked['checked_at'] >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        lag = measure_replica_lag(alias)
+        checked = {
+            'checked_at': now,
+            'lag_seconds': lag,
+            'healthy': lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS,
+        }
+        with _lag_lock:
+            _lag_checks[alias] = checked
+        if not checked['healthy']:
+            metrics.increment(f'db.replica.{alias}.unhealthy')
+    return checked['healthy']
+
+
+def get_replica_status():
+    with _lag_lock:
+        return {
+            alias: {
+                'lag_seconds': _lag_checks.get(alias, {}).get('lag_seconds'),
+                'healthy': _lag_checks.get(alias, {}).get('healthy'),
+            }
+            for alias in get_replica_aliases()
+        }
+
+
+class PrimaryReplicaRouter:
+    """
+    Send writes to the primary and safe reads to a healthy replica.
+
+    Reads stay on the primary when the context is pinned (unsafe requests and
+    the sticky window after them), inside a primary transaction, or when every
+    replica is lagging or down.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = get_replica_aliases()
+        if not replicas or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            metrics.increment('db.reads.primary')
+            return DEFAULT_DB_ALIAS
+
+        healthy = [alias for alias in replicas if replica_is_healthy(alias)]
+        if not healthy:
+            metrics.increment('db.reads.primary_fallback')
+            return DEFAULT_DB_ALIAS
+
+        metrics.increment('db.reads.replica')
+        return random.choice(healthy)
+
+    def db_for_write(self, model, **hints):
+        metrics.increment('db.writes')
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def sticky_cache_key(engineer_id):
+    return f'db:sticky:engineer:{engineer_id}'
+
+
+def pin_recent_writer(user):
+    """
+    Route the rest of this request's reads to the primary if ``user`` wrote
+    within REPLICA_STICKY_SECONDS. Called once the user is known: by the
+    middleware for session users, and by Firebase authentication otherwise.
+    """
+    if _pinned.get() or not user.is_authenticated or not get_replica_aliases():
+        return
+    if cache.get(sticky_cache_key(user.pk)) is not None:
+        _pinned.set(True)
+        metrics.increment('db.requests.pinned')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pin unsafe requests to the primary, and keep the same engineer's reads on
+    the primary for REPLICA_STICKY_SECONDS afterwards, from any token or
+    device, so they see their own writes despite replication lag. Views
+    marked replica_safe are treated like reads.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _before(self, request):
+        # Setting the flag here also scopes later pins to this request
+        writes = may_write(request)
+        token = _pinned.set(writes)
+        if writes:
+            metrics.increment('db.requests.pinned')
+        return token, writes
+
+    def _remember_write(self, request, response, writes):
+        if not writes or response.status_code >= 400:
+            return
+        # DRF and async_login_required set request.user once they authenticate
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            cache.set(sticky_cache_key(user.pk), 1, settings.REPLICA_STICKY_SECONDS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not get_replica_aliases():
+            return self.get_response(request)
+
+        token, writes = self._before(request)
+        try:
+            pin_recent_writer(request.user)
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        self._remember_write(request, response, writes)
+        return response
+
+    async def __acall__(self, request):
+        if not get_replica_aliases():
+            return await self.get_response(request)
+
+        token, writes = self._before(request)
+        try:
+            pin_recent_writer(await request.auser())
+            response = await self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        self._remember_write(request, response, writes)
+        return response
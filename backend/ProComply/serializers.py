@@ -0,0 +1,72 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin for ``?fields=a,b`` and ``?exclude=c`` on reads,
+    or the ``fields=`` / ``exclude=`` keyword arguments.
+
+    ``sparse_columns()`` lists the model columns the remaining fields read,
+    so views can push the selection down with ``apply_sparse_fieldset``.
+    """
+    # Columns read by fields whose source is not a model column
+    # (SerializerMethodFields and model properties)
+    field_columns = {}
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is not None and request.method in SAFE_METHODS:
+            fields = fields or parse_field_list(request.query_params.get('fields'))
+            exclude = exclude or parse_field_list(request.query_params.get('exclude'))
+
+        self.is_sparse = bool(fields or exclude)
+        if not self.is_sparse:
+            return
+
+        unknown = set(fields or []).union(exclude or []) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+
+        for name in list(self.fields):
+            if (fields and name not in fields) or (exclude and name in exclude):
+                self.fields.pop(name)
+
+    def sparse_columns(self):
+        """Model columns (ORM lookups) needed to render the selected fields"""
+        opts = self.Meta.model._meta
+        columns = []
+        for name, field in self.fields.items():
+            if name in self.field_columns:
+                columns.extend(self.field_columns[name])
+                continue
+            if field.source == '*':
+                continue
+            try:
+                opts.get_field(field.source.split('.')[0])
+            except FieldDoesNotExist:
+                continue
+            columns.append(field.source.replace('.', '__'))
+        return list(dict.fromkeys(columns))
+
+
+def apply_sparse_fieldset(queryset, serializer):
+    """Restrict a queryset to the columns a sparse serializer will read"""
+    if not getattr(serializer, 'is_sparse', False):
+        return queryset
+
+    columns = serializer.sparse_columns() or ['pk']
+    relations = {column.split('__')[0] for column in columns if '__' in column}
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
@@ -12,14 +12,16 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import cloudinary
 import os
 import dj_database_url
-# Initialize Firebase
-try:
-    from . import firebase
-except ImportError:
-    pass
+# Initialize Firebase (ProComply.settings_test turns this off)
+if config('FIREBASE_INIT', 'True') == 'True':
+    try:
+        from . import firebase
+    except ImportError:
+        pass
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'compliance',
     'accounts',
+    'monitoring',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -56,12 +59,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'ProComply.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.middleware.ProfilerMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 ]
 
@@ -76,7 +82,15 @@ CORS_ALLOW_HEADERS = [
     'origin',
     'user-agent',
     'x-csrftoken',
-    'x-requested-with'
+    'x-requested-with',
+    'x-profile',
+    'idempotency-key',
+    'if-none-match',
+]
+CORS_EXPOSE_HEADERS = [
+    'x-profile-id',
+    'idempotent-replayed',
+    'etag',
 ]
 
 ROOT_URLCONF = 'ProComply.urls'
@@ -114,16 +128,68 @@ if 'DATABASE_URL' in os.environ:
         )
     }
 else:
-DATABASES = {
-    'default': {
-        'ENGINE': config('DATABASE_ENGINE'),
-        'NAME': config('DATABASE_NAME'),
-        'USER': config('DATABASE_USER'),
-        'PASSWORD': config('DATABASE_PASSWORD'),
-        'HOST': config('DATABASE_HOST'),
-        'PORT': config('DATABASE_PORT'),
+    DATABASES = {
+        'default': {
+            'ENGINE': config('DATABASE_ENGINE'),
+            'NAME': config('DATABASE_NAME'),
+            'USER': config('DATABASE_USER'),
+            'PASSWORD': config('DATABASE_PASSWORD'),
+            'HOST': config('DATABASE_HOST'),
+            'PORT': config('DATABASE_PORT'),
+        }
     }
+
+# Read replicas (comma-separated database URLs); safe reads are routed there
+# by ProComply.routers and writers stick to the primary for a short window.
+DATABASE_REPLICA_URLS = [url for url in config('DATABASE_REPLICA_URLS', '').split(',') if url]
+for index, url in enumerate(DATABASE_REPLICA_URLS):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(url, conn_max_age=600)
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['ProComply.routers.PrimaryReplicaRouter']
+
+
+# Caches: a per-process "local" tier, and a "default" tier shared between
+# workers when CACHE_SHARED_URL is set (redis://host:port/db or file:///path).
+# See ProComply.cache for the per-engineer versioned keys. Throttle buckets
+# also live in "default", so without a shared cache every worker enforces
+# the full rate on its own (system check ProComply.W001).
+CACHE_SHARED_URL = config('CACHE_SHARED_URL', '')
+
+CACHES = {
+    'local': {
+        'BACKEND': 'ProComply.cache.InstrumentedLocMemCache',
+        'LOCATION': 'local',
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_LOCAL_MAX_ENTRIES', 5000, cast=int)},
+    },
 }
+if CACHE_SHARED_URL.startswith('redis'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_SHARED_URL,
+    }
+elif CACHE_SHARED_URL.startswith('file://'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_SHARED_URL[len('file://'):],
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+else:
+    # Single process: the default tier is the local one
+    CACHES['default'] = CACHES['local']
+
+# Per-engineer caches and ETags rely on generation counters every worker
+# sees, so without a shared cache they are off unless the deployment runs
+# a single process (runserver, one gunicorn worker) and opts in
+ENGINEER_CACHE_ENABLED = config('ENGINEER_CACHE_ENABLED', bool(CACHE_SHARED_URL), cast=bool)
+
+# Read-your-writes pins live in the default cache and must reach every worker
+if DATABASE_REPLICA_URLS and not CACHE_SHARED_URL:
+    raise ImproperlyConfigured('DATABASE_REPLICA_URLS requires CACHE_SHARED_URL')
+
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', 15, cast=int)
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', 5, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', 5, cast=float)
 
 
 # Password validation
@@ -155,12 +221,35 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # The browsable API is only rendered in development
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'ProComply.renderers.FastJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'ProComply.throttling.UserTokenBucketThrottle',
+        'ProComply.throttling.AnonTokenBucketThrottle',
     ],
+    # Token bucket sizes per scope (see ProComply.throttling)
+    'DEFAULT_THROTTLE_RATES': {
+        'user': config('THROTTLE_USER_RATE', '600/min'),
+        'anon': config('THROTTLE_ANON_RATE', '120/min'),
+        'report': config('THROTTLE_REPORT_RATE', '20/hour'),
+        'export': config('THROTTLE_EXPORT_RATE', '30/hour'),
+        'sync': config('THROTTLE_SYNC_RATE', '30/min'),
+    },
+    # Reverse proxies in front of the app. IP throttles only trust that many
+    # X-Forwarded-For entries; 0 keys them on REMOTE_ADDR
+    'NUM_PROXIES': config('NUM_PROXIES', 0, cast=int),
 }
 
+# How long Idempotency-Key responses are replayed (purge with `manage.py purge-idempotency-keys`)
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', 24, cast=int)
+# An unfinished request older than this is treated as crashed and may be retried
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = 60
+
+# PDF reports rendered at once per process; extra requests get a 503
+REPORT_MAX_CONCURRENCY = config('REPORT_MAX_CONCURRENCY', 2, cast=int)
+
 AUTHENTICATION_BACKENDS = [
     'accounts.authentication.FirebaseBackend',
     'django.contrib.auth.backends.ModelBackend',
@@ -209,6 +298,23 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Thread pool for blocking SDK calls (Firebase, Brevo, Cloudinary) made from async views
+BLOCKING_IO_MAX_WORKERS = config('BLOCKING_IO_MAX_WORKERS', 32, cast=int)
+
+# Opt-in request profiling for staff (X-Profile header or ?_profile=1)
+PROFILING_ENABLED = config('PROFILING_ENABLED', 'True') == 'True'
+PROFILING_DIR = config('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_PROFILES = config('PROFILING_MAX_PROFILES', 200, cast=int)
+
+# Slow query capture (summarize with `manage.py summarize-slow-queries`)
+SLOW_QUERY_CAPTURE_ENABLED = config('SLOW_QUERY_CAPTURE_ENABLED', 'True') == 'True'
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', 200, cast=int)
+SLOW_QUERY_SAMPLE_RATE = config('SLOW_QUERY_SAMPLE_RATE', 1.0, cast=float)
+SLOW_QUERY_MAX_PER_MINUTE = config('SLOW_QUERY_MAX_PER_MINUTE', 30, cast=int)
+SLOW_QUERY_LOG_FILE = config('SLOW_QUERY_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'slow_queries.log'))
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUP_COUNT = 5
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -0,0 +1,73 @@
+"""
+Hermetic settings for the test suite: no external credentials, no Firebase
+initialization, an in-memory database, and local fakes for Firebase,
+Cloudinary and Brevo installed by ProComply.test_runner.
+
+    python manage.py test --settings=ProComply.settings_test
+"""
+import os
+
+# Forced rather than defaulted, so a developer's .env or DATABASE_URL never leaks in
+TEST_ENVIRONMENT = {
+    'SECRET_KEY': 'test-secret-key',
+    'DEBUG': 'False',
+    'FIREBASE_INIT': 'False',
+    'DATABASE_ENGINE': 'django.db.backends.sqlite3',
+    'DATABASE_NAME': ':memory:',
+    'DATABASE_USER': '',
+    'DATABASE_PASSWORD': '',
+    'DATABASE_HOST': '',
+    'DATABASE_PORT': '',
+    'DATABASE_REPLICA_URLS': '',
+    'CACHE_SHARED_URL': '',
+    # Each test process is a single worker, so the local generations are exact
+    'ENGINEER_CACHE_ENABLED': 'True',
+    'CLOUDINARY_CLOUD_NAME': 'test',
+    'CLOUDINARY_API_KEY': 'test',
+    'CLOUDINARY_API_SECRET': 'test',
+    'BREVO_EMAIL': 'test@example.com',
+    'BREVO_SMTP_KEY': 'test',
+    'PROFILING_ENABLED': 'False',
+    'SLOW_QUERY_CAPTURE_ENABLED': 'False',
+}
+os.environ.pop('DATABASE_URL', None)
+os.environ.update(TEST_ENVIRONMENT)
+
+from .settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+TEST_RUNNER = 'ProComply.test_runner.HermeticTestRunner'
+
+# Each test process is a single worker, so per-process throttle buckets are exact
+SILENCED_SYSTEM_CHECKS = ['ProComply.W001']
+
+# Hashing strength is irrelevant in tests and dominates user creation
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'ERROR',
+    },
+    'loggers': {
+        # Views log expected 4xx responses as warnings
+        'django.request': {
+            'level': 'CRITICAL',
+        },
+    },
+}
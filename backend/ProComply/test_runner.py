@@ -0,0 +1,37 @@
+from django.test.runner import DiscoverRunner, ParallelTestSuite, _init_worker
+
+from monitoring.fakes import external_service_fakes
+
+_fakes = None
+
+
+def install_fakes():
+    """Swap Firebase, Cloudinary and Brevo for the local fakes in this process (once)"""
+    global _fakes
+    if _fakes is None:
+        _fakes = external_service_fakes()
+        _fakes.__enter__()
+
+
+class HermeticParallelTestSuite(ParallelTestSuite):
+    def init_worker(*args, **kwargs):
+        _init_worker(*args, **kwargs)
+        # Spawned workers do not inherit the parent's patches
+        install_fakes()
+
+
+class HermeticTestRunner(DiscoverRunner):
+    """
+    Test runner for ProComply.settings_test: external services are faked in
+    every process, and tests run in parallel unless --parallel 1 is given.
+    """
+    parallel_test_suite = HermeticParallelTestSuite
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel='auto')
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        install_fakes()
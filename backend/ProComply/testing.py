@@ -0,0 +1,52 @@
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from monitoring.fakes import make_fake_token
+
+
+class _AssertMaxQueriesContext(CaptureQueriesContext):
+    def __init__(self, test_case, limit, connection):
+        self.test_case = test_case
+        self.limit = limit
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        queries = '\n'.join(
+            f"{index}. {query['sql']}" for index, query in enumerate(self.captured_queries, start=1)
+        )
+        self.test_case.assertLessEqual(
+            executed, self.limit,
+            f"{executed} queries executed, budget is {self.limit}\nCaptured queries were:\n{queries}"
+        )
+
+
+class QueryBudgetMixin:
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        """Like assertNumQueries, but fails only when the budget is exceeded"""
+        return _AssertMaxQueriesContext(self, limit, connections[using])
+
+
+class APITestCase(QueryBudgetMixin, TestCase):
+    """
+    Base class for API tests: starts from empty caches (primary keys are
+    reused between tests, and so would per-engineer cache keys) and gives
+    clients that authenticate with a fake Firebase token.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for alias in caches:
+            caches[alias].clear()
+
+    def client_for(self, engineer):
+        """APIClient sending ``engineer``'s fake Firebase bearer token"""
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {make_fake_token(engineer)}')
+        return client
@@ -0,0 +1,205 @@
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from monitoring import metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# A crashed lock holder blocks its bucket for at most this long
+BUCKET_LOCK_TIMEOUT = 1
+# How long a request waits for a bucket another request is updating
+BUCKET_LOCK_WAIT = 0.5
+
+
+def parse_rate(rate):
+    """'30/min' -> (30, 60): bucket capacity and the seconds to refill it"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+@contextmanager
+def bucket_lock(key):
+    """
+    Per-bucket mutex built on cache.add (SET NX on Redis, locked on LocMem).
+    Yields False when the bucket stays busy for BUCKET_LOCK_WAIT seconds.
+    """
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + BUCKET_LOCK_WAIT
+    while not cache.add(lock_key, 1, timeout=BUCKET_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(0.002)
+    try:
+        yield True
+    finally:
+        cache.delete(lock_key)
+
+
+def consume_token(key, capacity, period):
+    """
+    Take one token from the bucket stored under ``key`` in the shared cache.
+    Returns (allowed, seconds until the next token).
+    """
+    refill_per_second = capacity / period
+
+    # Read-modify-write under the bucket lock, or concurrent requests all
+    # spend the same token
+    with bucket_lock(key) as locked:
+        if not locked:
+            metrics.increment('throttle.lock_timeout')
+            return False, 1 / refill_per_second
+
+        now = time.time()
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        if tokens < 1:
+            return False, (1 - tokens) / refill_per_second
+
+        # A full bucket is the same as a missing one, so the entry can expire
+        cache.set(key, (tokens - 1, now), timeout=period)
+        return True, 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by a token bucket in the shared cache. Rates come
+    from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope], and wait() drives
+    the Retry-After header.
+    """
+    scope = None
+
+    def __init__(self):
+        self.capacity, self.period = parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.wait_seconds = 0
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        allowed, self.wait_seconds = consume_token(key, self.capacity, self.period)
+        if not allowed:
+            metrics.increment(f'throttle.{self.scope}.throttled')
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Per-user budget, falling back to the client IP for anonymous requests"""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'throttle:{self.scope}:user:{user.pk}'
+        return f'throttle:{self.scope}:ip:{self.get_ident(request)}'
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Per-IP budget for unauthenticated requests only"""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return None
+        return f'throttle:{self.scope}:ip:{self.get_ident(request)}'
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Per-IP budget regardless of authentication"""
+
+    def get_cache_key(self, request, view):
+        return f'throttle:{self.scope}:ip:{self.get_ident(request)}'
+
+
+class ReportThrottle(UserTokenBucketThrottle):
+    scope = 'report'
+
+
+class ExportThrottle(UserTokenBucketThrottle):
+    scope = 'export'
+
+
+class SyncThrottle(IPTokenBucketThrottle):
+    scope = 'sync'
+
+
+def throttle_view(*throttle_classes):
+    """Apply DRF-style throttles to a plain (sync or async) Django view"""
+    def check(request):
+        for throttle_class in throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, None):
+                return throttled_response(throttle.wait())
+        return None
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                response = await sync_to_async(check)(request)
+                return response or await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return check(request) or view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def throttled_response(wait):
+    response = JsonResponse({'detail': 'Request was throttled.'}, status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def limit_concurrency(name, limit_setting):
+    """
+    Cap how many requests of one kind run at once in this process. Extra
+    requests get an immediate 503 with Retry-After instead of queueing
+    behind the expensive ones and tying up every worker thread.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with _semaphores_lock:
+                semaphore = _semaphores.get(name)
+                if semaphore is None:
+                    semaphore = _semaphores[name] = threading.BoundedSemaphore(getattr(settings, limit_setting))
+
+            if not semaphore.acquire(blocking=False):
+                metrics.increment(f'concurrency.{name}.rejected')
+                return Response(
+                    {'detail': 'Server is busy, please retry shortly.'},
+                    status=503,
+                    headers={'Retry-After': '5'}
+                )
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                semaphore.release()
+        return wrapper
+    return decorator
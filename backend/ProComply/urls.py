@@ -23,4 +23,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
     path('api/compliance/', include('compliance.urls')),
+    path('api/monitoring/', include('monitoring.urls')),
 ]
\ No newline at end of file
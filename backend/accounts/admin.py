@@ -1,3 +1,29 @@
 from django.contrib import admin
 
-# Register your models here.
+from ProComply.admin_utils import LargeTableAdmin
+from .models import Engineer, UserProfile
+
+
+@admin.register(Engineer)
+class EngineerAdmin(LargeTableAdmin):
+    list_display = ('email', 'first_name', 'last_name', 'ebk_registration_number', 'is_active', 'is_staff', 'date_joined')
+    list_filter = ('is_active', 'is_staff')
+    search_fields = ('email', 'ebk_registration_number')
+    ordering = ('-id',)
+    readonly_fields = ('firebase_uid', 'last_login', 'date_joined')
+    filter_horizontal = ('groups', 'user_permissions')
+    fieldsets = (
+        (None, {'fields': ('email', 'first_name', 'last_name', 'ebk_registration_number', 'firebase_uid')}),
+        ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
+        ('Dates', {'fields': ('last_login', 'date_joined')}),
+    )
+
+
+@admin.register(UserProfile)
+class UserProfileAdmin(LargeTableAdmin):
+    list_display = ('engineer', 'engineering_specialization', 'license_expiry_date', 'pdu_units_earned', 'updated_at')
+    list_select_related = ('engineer',)
+    search_fields = ('engineer__email', 'engineer__ebk_registration_number')
+    autocomplete_fields = ('engineer',)
+    ordering = ('-id',)
+    readonly_fields = ('pdu_units_earned', 'created_at', 'updated_at')
@@ -0,0 +1,83 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from django.contrib.auth import get_user_model
+from .authentication import async_login_required
+from .cache import aget_cached_profile, aset_cached_profile
+from .models import UserProfile
+from .serializers import UserProfileSerializer
+from ProComply.throttling import SyncThrottle, throttle_view
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+@csrf_exempt
+@require_POST
+@throttle_view(SyncThrottle)
+async def sync_firebase_user_async(request):
+    """Async version of sync_firebase_user"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    firebase_uid = data.get('firebase_uid')
+    email = data.get('email')
+    name = data.get('name', '')
+
+    if not firebase_uid or not email:
+        return JsonResponse({
+            'error': 'Missing required fields',
+            'required': ['firebase_uid', 'email']
+        }, status=400)
+
+    name_parts = name.split(' ', 1)
+    first_name = name_parts[0] if name_parts else ''
+    last_name = name_parts[1] if len(name_parts) > 1 else ''
+
+    try:
+        user, created = await User.objects.aget_or_create(
+            firebase_uid=firebase_uid,
+            defaults={
+                'email': email,
+                'first_name': first_name,
+                'last_name': last_name,
+                'is_active': True,
+            }
+        )
+    except Exception as e:
+        logger.error(f"Sync error: {str(e)}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+    logger.info(f"User sync: {email} ({'created' if created else 'exists'})")
+
+    return JsonResponse({
+        'status': 'success',
+        'user_id': user.id,
+        'email': user.email,
+        'created': created
+    })
+
+
+@require_GET
+@async_login_required
+async def profile_async(request):
+    """Async version of ProfileView.get"""
+    data = await aget_cached_profile(request.user.pk)
+    if data is None:
+        try:
+            profile = await UserProfile.objects.select_related('engineer').aget(engineer=request.user)
+        except UserProfile.DoesNotExist:
+            return JsonResponse({'error': 'Profile not found'}, status=404)
+
+        data = UserProfileSerializer(profile).data
+        await aset_cached_profile(request.user.pk, data)
+
+    return JsonResponse({
+        'status': 'success',
+        'data': data
+    })
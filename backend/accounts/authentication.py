@@ -1,8 +1,12 @@
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth import get_user_model
+from django.http import JsonResponse
 from firebase_admin import auth
 from rest_framework import authentication
 from rest_framework import exceptions
+from ProComply.executor import run_blocking
+from ProComply.routers import pin_recent_writer
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -69,6 +73,7 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
                     user.save()
                     logger.info(f"Updated user info: {email}")
             
+            pin_recent_writer(user)
             return (user, decoded_token)
             
         except auth.InvalidIdTokenError:
@@ -107,4 +112,77 @@ class FirebaseBackend(BaseBackend):
         try:
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+
+
+async def aauthenticate_firebase(request):
+    """
+    Async counterpart of FirebaseAuthentication for async views.
+    Token verification runs on the blocking I/O pool, user lookup on the async ORM.
+    """
+    auth_header = request.META.get('HTTP_AUTHORIZATION')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+
+    id_token = auth_header.split('Bearer ')[1]
+
+    try:
+        decoded_token = await run_blocking(auth.verify_id_token, id_token)
+    except auth.InvalidIdTokenError:
+        raise exceptions.AuthenticationFailed('Invalid Firebase ID token')
+    except auth.ExpiredIdTokenError:
+        raise exceptions.AuthenticationFailed('Expired Firebase token')
+    except auth.RevokedIdTokenError:
+        raise exceptions.AuthenticationFailed('Revoked Firebase token')
+    except Exception as e:
+        logger.error(f"Firebase authentication error: {str(e)}")
+        raise exceptions.AuthenticationFailed(f'Authentication failed: {str(e)}')
+
+    email = decoded_token.get('email')
+    if not email:
+        raise exceptions.AuthenticationFailed('No email found in Firebase token')
+
+    name_parts = decoded_token.get('name', '').split(' ', 1)
+    first_name = name_parts[0] if name_parts else ''
+    last_name = name_parts[1] if len(name_parts) > 1 else ''
+
+    user, created = await User.objects.aget_or_create(
+        firebase_uid=decoded_token['uid'],
+        defaults={
+            'email': email,
+            'first_name': first_name,
+            'last_name': last_name,
+            'is_active': True,
+        }
+    )
+
+    if created:
+        logger.info(f"Created new user: {email}")
+    elif (user.email, user.first_name, user.last_name) != (email, first_name, last_name):
+        user.email = email
+        user.first_name = first_name
+        user.last_name = last_name
+        await user.asave()
+        logger.info(f"Updated user info: {email}")
+
+    pin_recent_writer(user)
+    return user
+
+
+def async_login_required(view):
+    """Authenticate an async view with a Firebase token or the session"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aauthenticate_firebase(request)
+        except exceptions.AuthenticationFailed as e:
+            return JsonResponse({'detail': str(e.detail)}, status=401)
+
+        if user is None:
+            user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import date
+
+from ProComply.cache import aget_for_engineer, aset_for_engineer, get_for_engineer, set_for_engineer
+
+
+def get_cached_profile(engineer_id):
+    """Serialized profile projection, or None on a miss. Keyed by date for license_status"""
+    return get_for_engineer(engineer_id, 'profile', date.today().isoformat())
+
+
+def set_cached_profile(engineer_id, data):
+    set_for_engineer(engineer_id, 'profile', dict(data), date.today().isoformat())
+
+
+async def aget_cached_profile(engineer_id):
+    return await aget_for_engineer(engineer_id, 'profile', date.today().isoformat())
+
+
+async def aset_cached_profile(engineer_id, data):
+    await aset_for_engineer(engineer_id, 'profile', dict(data), date.today().isoformat())
@@ -0,0 +1,120 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+def hash_request(request):
+    """Stable digest of the method, path, parsed body and uploaded file contents"""
+    digest = hashlib.sha256(f"{request.method} {request.path}".encode())
+    data = request.data
+
+    if hasattr(data, 'lists'):
+        for name, values in sorted(data.lists()):
+            digest.update(name.encode())
+            for value in values:
+                if hasattr(value, 'chunks'):
+                    for chunk in value.chunks():
+                        digest.update(chunk)
+                    value.seek(0)
+                else:
+                    digest.update(str(value).encode())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+
+    return digest.hexdigest()
+
+
+def _claim(request, key, request_hash):
+    """Create the in-progress record, or return the existing one for this key"""
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                engineer=request.user,
+                key=key,
+                request_method=request.method,
+                request_path=request.path,
+                request_hash=request_hash,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            ), True
+    except IntegrityError:
+        pass
+
+    existing = IdempotencyKey.objects.filter(engineer=request.user, key=key).first()
+    if existing is None:
+        return None, False
+
+    abandoned = (
+        existing.response_status is None and
+        existing.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+    )
+    if existing.expires_at <= now or abandoned:
+        # Expired or crashed mid-request; start over with a fresh record
+        existing.delete()
+        return _claim(request, key, request_hash)
+
+    return existing, False
+
+
+def idempotent(handler):
+    """
+    Replay the first response for a repeated Idempotency-Key instead of
+    running the handler again. Keys are scoped to the engineer; reusing a
+    key for a different request is a 422, and a retry that arrives while
+    the first request is still running gets a 409.
+    """
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return handler(view, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        request_hash = hash_request(request)
+        record, created = _claim(request, key, request_hash)
+
+        if not created:
+            if record is None or record.response_status is None:
+                return Response(
+                    {'error': 'A request with this Idempotency-Key is still in progress'},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={'Retry-After': '1'}
+                )
+            if record.request_hash != request_hash:
+                return Response(
+                    {'error': 'Idempotency-Key was already used for a different request'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            return Response(record.response_body, status=record.response_status, headers={'Idempotent-Replayed': 'true'})
+
+        try:
+            response = handler(view, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            # Let the client retry server errors
+            record.delete()
+        else:
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['response_status', 'response_body'])
+        return response
+
+    return wrapper
@@ -0,0 +1,138 @@
+from datetime import date
+import json
+import logging
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from ProComply.cache import bump_engineer_generation
+from accounts.models import UserProfile
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+NAME_MAX_LENGTH = 50
+
+
+def parse_export_user(record):
+    """Map one `firebase auth:export --format=json` user onto Engineer fields"""
+    uid = record.get('localId')
+    email = (record.get('email') or '').strip()
+    if not uid or not email:
+        return None
+
+    name_parts = (record.get('displayName') or '').split(' ', 1)
+    return {
+        'firebase_uid': uid,
+        'email': User.objects.normalize_email(email),
+        'first_name': name_parts[0][:NAME_MAX_LENGTH],
+        'last_name': name_parts[1][:NAME_MAX_LENGTH] if len(name_parts) > 1 else '',
+        'is_active': not record.get('disabled', False),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Bulk import engineers (and their profiles) from a Firebase Auth JSON export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export_file', help='Output of `firebase auth:export users.json --format=json`')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--skip-snapshots', action='store_true', help='Do not rebuild compliance snapshots afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['export_file']) as export_file:
+                records = json.load(export_file).get('users', [])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read Firebase export: {e}")
+
+        users = {}
+        skipped = 0
+        for record in records:
+            user = parse_export_user(record)
+            if user is None or user['firebase_uid'] in users:
+                skipped += 1
+                continue
+            users[user['firebase_uid']] = user
+
+        totals = {'inserted': 0, 'updated': 0, 'skipped': skipped}
+        batch = list(users.values())
+        chunk_size = options['chunk_size']
+        for start in range(0, len(batch), chunk_size):
+            counts = self.import_chunk(batch[start:start + chunk_size])
+            for name, count in counts.items():
+                totals[name] += count
+            self.stdout.write(f"Processed {min(start + chunk_size, len(batch))}/{len(batch)}")
+
+        if totals['inserted'] and not options['skip_snapshots']:
+            from compliance.snapshots import rebuild_snapshots
+            rebuild_snapshots(date.today().year)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {totals['inserted']}, updated {totals['updated']}, skipped {totals['skipped']}"
+        ))
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        uids = [user['firebase_uid'] for user in chunk]
+        emails = [user['email'] for user in chunk]
+        existing = list(User.objects.filter(Q(firebase_uid__in=uids) | Q(email__in=emails)).only(
+            'id', 'firebase_uid', 'email', 'first_name', 'last_name', 'is_active'
+        ))
+        by_uid = {engineer.firebase_uid: engineer for engineer in existing if engineer.firebase_uid}
+        by_email = {engineer.email: engineer for engineer in existing}
+
+        to_create, to_update = [], []
+        skipped = 0
+        for user in chunk:
+            engineer = by_uid.get(user['firebase_uid'])
+            if engineer is None:
+                engineer = by_email.get(user['email'])
+                if engineer is not None and engineer.firebase_uid:
+                    # Same email already linked to a different Firebase account
+                    logger.warning(f"Skipping {user['email']}: linked to another Firebase uid")
+                    skipped += 1
+                    continue
+
+            if engineer is None:
+                to_create.append(User(password=make_password(None), **user))
+                continue
+
+            changed = False
+            for field in ('firebase_uid', 'first_name', 'last_name', 'is_active'):
+                value = user[field]
+                if field in ('first_name', 'last_name') and not value:
+                    continue
+                if getattr(engineer, field) != value:
+                    setattr(engineer, field, value)
+                    changed = True
+            if changed:
+                to_update.append(engineer)
+            else:
+                skipped += 1
+
+        User.objects.bulk_create(to_create, ignore_conflicts=True)
+        User.objects.bulk_update(to_update, ['firebase_uid', 'first_name', 'last_name', 'is_active'])
+        for engineer in to_update:
+            bump_engineer_generation(engineer.pk)
+
+        # ignore_conflicts leaves pks unset; look the new rows up again
+        created_ids = list(User.objects.filter(
+            firebase_uid__in=[engineer.firebase_uid for engineer in to_create]
+        ).values_list('id', flat=True))
+
+        # bulk_create skips post_save, so create the profiles here
+        engineer_ids = created_ids + [engineer.pk for engineer in to_update]
+        UserProfile.objects.bulk_create(
+            [UserProfile(engineer_id=engineer_id) for engineer_id in engineer_ids],
+            ignore_conflicts=True
+        )
+
+        return {
+            'inserted': len(created_ids),
+            'updated': len(to_update),
+            'skipped': skipped + len(to_create) - len(created_ids),
+        }
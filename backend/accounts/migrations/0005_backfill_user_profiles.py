@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:19
+
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    """Every engineer gets a profile so ProfileView.get never has to create one"""
+    Engineer = apps.get_model('accounts', 'Engineer')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+
+    missing = Engineer.objects.filter(profile__isnull=True).values_list('id', flat=True)
+    UserProfile.objects.bulk_create(
+        (UserProfile(engineer_id=engineer_id) for engineer_id in missing.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_rename_firebasese_uid_engineer_firebase_uid_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -2,9 +2,69 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from django.core.validators import RegexValidator
+from django.core.serializers.json import DjangoJSONEncoder
 from cloudinary.models import CloudinaryField
 
 # Create your models here.
+class DirtyFieldsMixin:
+    """
+    Remember field values as loaded from the database so save() only
+    UPDATEs the columns that changed, and skips the query when none did.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def _snapshot_fields(self, attnames=None):
+        loaded = getattr(self, '_loaded_values', {}) if attnames is not None else {}
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if attnames is None or field.attname in attnames:
+                loaded[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded
+
+    def get_dirty_fields(self):
+        """Attnames changed since load, or None if the instance was never loaded"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        return [
+            attname for attname, value in loaded.items()
+            if attname in self.__dict__ and self.__dict__[attname] != value
+        ]
+
+    def save(self, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                auto_now = [
+                    field.attname for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False)
+                ]
+                kwargs['update_fields'] = update_fields = dirty + auto_now
+
+        super().save(**kwargs)
+
+        if update_fields is None:
+            self._snapshot_fields()
+        else:
+            self._snapshot_fields({self._meta.get_field(name).attname for name in update_fields})
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        fields = kwargs.get('fields')
+        if fields is None:
+            self._snapshot_fields()
+        else:
+            self._snapshot_fields({self._meta.get_field(name).attname for name in fields})
+
+
 class EngineerManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -20,7 +80,7 @@ class EngineerManager(BaseUserManager):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('is_superuser', True)
         return self.create_user(email, password, **extra_fields)
-class Engineer(AbstractBaseUser, PermissionsMixin):
+class Engineer(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     firebase_uid = models.CharField(max_length=128, unique=True, null=True, blank=True)
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=50)
@@ -51,7 +111,7 @@ class Engineer(AbstractBaseUser, PermissionsMixin):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
 
-class UserProfile(models.Model):
+class UserProfile(DirtyFieldsMixin, models.Model):
     engineer = models.OneToOneField(
         Engineer,
         on_delete=models.CASCADE,
@@ -98,4 +158,27 @@ class UserProfile(models.Model):
         else:
             return "Valid"
 
-            
\ No newline at end of file
+            
+
+class IdempotencyKey(models.Model):
+    """First response to a client request sent with an Idempotency-Key header"""
+    engineer = models.ForeignKey(Engineer, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_method = models.CharField(max_length=10)
+    request_path = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+
+    # Null until the first request finishes
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True)
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['engineer', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.engineer_id} {self.request_method} {self.request_path} ({self.key})"
@@ -1,16 +1,17 @@
 from rest_framework import serializers
 from .models import Engineer, UserProfile
 from django.contrib.auth import authenticate
+from ProComply.serializers import SparseFieldsetMixin
 
 
-class EngineerSerializer(serializers.ModelSerializer):
+class EngineerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Engineer
         fields = ['id', 'email', 'first_name', 'last_name', 'ebk_registration_number', 'date_joined']
         read_only_fields = ['id', 'email', 'date_joined']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     engineer_email = serializers.ReadOnlyField(source='engineer.email')    
     engineer_name = serializers.SerializerMethodField()
     engineer_id = serializers.ReadOnlyField(source='engineer.id')
@@ -24,6 +25,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
     pdu_units_remaining = serializers.ReadOnlyField()
     license_status = serializers.ReadOnlyField()
 
+    field_columns = {
+        'engineer_name': ['engineer__first_name', 'engineer__last_name'],
+        'profile_photo_url': ['profile_photo'],
+        'pdu_units_remaining': ['pdu_units_required', 'pdu_units_earned'],
+        'license_status': ['license_expiry_date'],
+    }
+
     class Meta:
         model = UserProfile
         fields = [
@@ -65,16 +73,23 @@ class UserProfileSerializer(serializers.ModelSerializer):
         if 'engineer' in validated_data:
             engineer_data = validated_data.pop('engineer')
         
-        # Update Engineer fields
+        # Update Engineer fields (only changed columns are written)
+        engineer_changed = False
         if engineer_data:
             engineer = instance.engineer
             for attr, value in engineer_data.items():
                 setattr(engineer, attr, value)
+            engineer_changed = bool(engineer.get_dirty_fields())
             engineer.save()
         
         # Update UserProfile fields (including profile_photo if uploaded)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        
+        if engineer_changed and not instance.get_dirty_fields():
+            # Profile itself is unchanged; only bump updated_at for the engineer edit
+            instance.save(update_fields=['updated_at'])
+        else:
+            instance.save()
         
         return instance
\ No newline at end of file
@@ -1,5 +1,6 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from ProComply.cache import bump_engineer_generation
 from .models import Engineer, UserProfile
 
 @receiver(post_save, sender=Engineer)
@@ -8,7 +9,9 @@ def create_user_profile(sender, instance, created, **kwargs):
         UserProfile.objects.create(engineer=instance)
 
 @receiver(post_save, sender=Engineer)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'profile'):
-        instance.profile.save()        
-         
\ No newline at end of file
+def invalidate_engineer_cache(sender, instance, **kwargs):
+    bump_engineer_generation(instance.pk)
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_user_profile_cache(sender, instance, **kwargs):
+    bump_engineer_generation(instance.engineer_id)
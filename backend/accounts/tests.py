@@ -1,3 +1,362 @@
-from django.test import TestCase
+import contextvars
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import MultiPartParser
+from rest_framework.request import Request
+
+from ProComply.checks import check_shared_cache
+from ProComply.routers import _pinned, sticky_cache_key
+from ProComply.testing import APITestCase
+from ProComply.throttling import consume_token
+from monitoring import metrics
+from monitoring.fakes import make_fake_token
+from .authentication import FirebaseAuthentication
+from .idempotency import hash_request
+from .models import Engineer, IdempotencyKey, UserProfile
+
+
+class SparseProfileTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user(
+            'profile@example.com', firebase_uid='profile-uid', first_name='Pro', last_name='File'
+        )
+        self.client = self.client_for(self.engineer)
+
+    def test_profile_fields_limit_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/accounts/profile/?fields=engineer_name,pdu_units_remaining')
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['data']), {'engineer_name', 'pdu_units_remaining'})
+        self.assertNotIn('"national_id"', sql)
+        self.assertNotIn('"phone_number"', sql)
+
+    def test_engineer_exclude(self):
+        response = self.client.get('/api/accounts/engineer/?exclude=date_joined,ebk_registration_number')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['data']), {'id', 'email', 'first_name', 'last_name'})
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Maximum queries per accounts endpoint. Budgets include the Firebase
+    token user lookup and are measured with cold caches.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user(
+            'budget@example.com', firebase_uid='budget-uid', first_name='Budget', last_name='Engineer'
+        )
+        self.client = self.client_for(self.engineer)
+
+    def test_sync_firebase(self):
+        payload = {'firebase_uid': 'budget-uid', 'email': 'budget@example.com', 'name': 'Budget Engineer'}
+        with self.assertMaxQueries(1):
+            response = self.client.post('/api/accounts/sync-firebase/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_sync_firebase_new_user(self):
+        payload = {'firebase_uid': 'new-uid', 'email': 'new@example.com', 'name': 'New Engineer'}
+        with self.assertMaxQueries(15):
+            response = self.client.post('/api/accounts/sync-firebase/', payload, format='json')
+        self.assertTrue(response.json()['created'])
+
+    def test_async_sync_firebase(self):
+        payload = {'firebase_uid': 'budget-uid', 'email': 'budget@example.com', 'name': 'Budget Engineer'}
+        with self.assertMaxQueries(1):
+            response = self.client.post('/api/accounts/async/sync-firebase/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_test_auth(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get('/api/accounts/test-auth/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_engineer_get(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get('/api/accounts/engineer/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_engineer_patch(self):
+        with self.assertMaxQueries(6):
+            response = self.client.patch('/api/accounts/engineer/', {'first_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_get(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get('/api/accounts/profile/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_patch(self):
+        with self.assertMaxQueries(10):
+            response = self.client.patch('/api/accounts/profile/', {'phone_number': '0712345678'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_put(self):
+        payload = {'first_name': 'Budget', 'last_name': 'Engineer', 'engineering_specialization': 'Civil'}
+        with self.assertMaxQueries(10):
+            response = self.client.put('/api/accounts/profile/', payload, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_async_profile(self):
+        with self.assertMaxQueries(2):
+            response = self.client.get('/api/accounts/async/profile/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_profile_photo(self):
+        UserProfile.objects.filter(engineer=self.engineer).update(profile_photo='image/upload/v1/profile_photos/fake-1.jpg')
+        with self.assertMaxQueries(6):
+            response = self.client.delete('/api/accounts/profile/photo/delete/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ThrottleTests(APITestCase):
+    def test_concurrent_requests_share_the_bucket(self):
+        get = LocMemCache.get
+
+        def slow_get(*args, **kwargs):
+            # Network latency of a shared cache widens the read-modify-write window
+            value = get(*args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        # Cache connections are per thread, so patch the backend class
+        with mock.patch.object(LocMemCache, 'get', slow_get), ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: consume_token('throttle:test', 5, 60)[0], range(30)))
+        self.assertEqual(results.count(True), 5)
+
+    def test_sync_throttle_ignores_spoofed_forwarded_for(self):
+        payload = {'firebase_uid': 'spoof-uid', 'email': 'spoof@example.com'}
+        statuses = [
+            self.client.post(
+                '/api/accounts/sync-firebase/', payload, content_type='application/json', HTTP_X_FORWARDED_FOR=f'10.0.0.{index}'
+            ).status_code
+            for index in range(31)
+        ]
+        self.assertEqual(statuses[:30], [200] * 30)
+        self.assertEqual(statuses[30], 429)
+
+    def test_per_process_buckets_are_flagged(self):
+        with override_settings(DEBUG=False, CACHE_SHARED_URL=''):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['ProComply.W001'])
+        with override_settings(DEBUG=False, CACHE_SHARED_URL='redis://cache:6379/0'):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+@mock.patch('ProComply.routers.get_replica_aliases', return_value=['replica_0'])
+class ReplicaStickinessTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user(
+            'sticky@example.com', firebase_uid='sticky-uid', first_name='Sticky', last_name='Engineer'
+        )
+
+    def is_pinned_after_authenticating(self, engineer):
+        # A refreshed token or a second device: same engineer, new Authorization header
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {make_fake_token(engineer)}')
+        context = contextvars.copy_context()
+        context.run(FirebaseAuthentication().authenticate, request)
+        return context.run(_pinned.get)
+
+    def test_write_pins_the_engineer_not_the_token(self, get_replica_aliases):
+        response = self.client_for(self.engineer).patch('/api/accounts/engineer/', {'last_name': 'Writer'}, format='json')
+        self.engineer.refresh_from_db()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(cache.get(sticky_cache_key(self.engineer.pk)))
+        self.assertTrue(self.is_pinned_after_authenticating(self.engineer))
+
+    def test_other_engineers_are_not_pinned(self, get_replica_aliases):
+        other = Engineer.objects.create_user('other@example.com', firebase_uid='other-uid', first_name='Other', last_name='Engineer')
+        self.client_for(self.engineer).patch('/api/accounts/engineer/', {'last_name': 'Writer'}, format='json')
+
+        self.assertFalse(self.is_pinned_after_authenticating(other))
+
+    def test_read_only_post_is_not_pinned(self, get_replica_aliases):
+        metrics.reset_counters()
+        planned = {'activity_type': 'INFORMAL', 'hours_spent': 2}
+
+        response = self.client_for(self.engineer).post('/api/compliance/cpd-activities/simulate/', planned, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('db.requests.pinned', metrics.get_counters())
+        self.assertIsNone(cache.get(sticky_cache_key(self.engineer.pk)))
+
+
+class IdempotencyTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user('idem@example.com', firebase_uid='idem-uid')
+        self.client = self.client_for(self.engineer)
+
+    def patch(self, client, body, key='profile-key', **kwargs):
+        kwargs.setdefault('format', 'json')
+        return client.patch('/api/accounts/profile/', body, HTTP_IDEMPOTENCY_KEY=key, **kwargs)
+
+    def specialization(self, engineer):
+        return UserProfile.objects.get(engineer=engineer).engineering_specialization
+
+    def test_retry_replays_the_first_response(self):
+        first = self.patch(self.client, {'engineering_specialization': 'Structural'})
+        UserProfile.objects.filter(engineer=self.engineer).update(engineering_specialization='Changed elsewhere')
+        retry = self.patch(self.client, {'engineering_specialization': 'Structural'})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+        # The handler did not run a second time
+        self.assertEqual(self.specialization(self.engineer), 'Changed elsewhere')
+
+    def test_reused_key_with_a_different_body_is_rejected(self):
+        self.patch(self.client, {'engineering_specialization': 'Structural'})
+
+        response = self.patch(self.client, {'engineering_specialization': 'Geotechnical'})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.specialization(self.engineer), 'Structural')
+
+    def test_retry_while_the_first_request_is_running_conflicts(self):
+        IdempotencyKey.objects.create(
+            engineer=self.engineer,
+            key='profile-key',
+            request_method='PATCH',
+            request_path='/api/accounts/profile/',
+            request_hash='in-progress',
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        response = self.patch(self.client, {'engineering_specialization': 'Structural'})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_server_error_releases_the_key(self):
+        with mock.patch('accounts.views.UserProfileSerializer.save', side_effect=RuntimeError('down')), self.assertLogs('accounts.views', 'ERROR'):
+            failed = self.patch(self.client, {'engineering_specialization': 'Structural'})
+        retry = self.patch(self.client, {'engineering_specialization': 'Structural'})
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(retry.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_engineer(self):
+        other = Engineer.objects.create_user('other@example.com', firebase_uid='other-uid')
+
+        self.patch(self.client, {'engineering_specialization': 'Structural'})
+        response = self.patch(self.client_for(other), {'engineering_specialization': 'Geotechnical'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(IdempotencyKey.objects.filter(key='profile-key').count(), 2)
+        self.assertEqual(self.specialization(other), 'Geotechnical')
+
+    def test_multipart_retry_replays(self):
+        first = self.patch(self.client, {'engineering_specialization': 'Structural'}, format='multipart')
+        retry = self.patch(self.client, {'engineering_specialization': 'Structural'}, format='multipart')
+        changed = self.patch(self.client, {'engineering_specialization': 'Geotechnical'}, format='multipart')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(changed.status_code, 422)
+
+    def test_uploaded_file_contents_are_hashed(self):
+        def upload_hash(content):
+            upload = SimpleUploadedFile('photo.png', content, content_type='image/png')
+            request = Request(RequestFactory().post('/api/accounts/profile/', {'profile_photo': upload}), parsers=[MultiPartParser()])
+            digest = hash_request(request)
+            # The file is rewound for the view that handles it next
+            self.assertEqual(request.data['profile_photo'].read(), content)
+            return digest
+
+        self.assertEqual(upload_hash(b'first'), upload_hash(b'first'))
+        self.assertNotEqual(upload_hash(b'first'), upload_hash(b'second'))
+
+    def test_purge_deletes_only_expired_keys(self):
+        now = timezone.now()
+        for key, expires_at in [('old', now - timedelta(minutes=1)), ('older', now - timedelta(days=1)), ('live', now + timedelta(hours=1))]:
+            IdempotencyKey.objects.create(
+                engineer=self.engineer, key=key, request_method='PATCH', request_path='/api/accounts/profile/',
+                request_hash=key, expires_at=expires_at,
+            )
+        out = StringIO()
+
+        call_command('purge-idempotency-keys', '--batch-size', '1', stdout=out)
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['live'])
+        self.assertIn('Purged 2 expired idempotency keys', out.getvalue())
+
+
+class ImportFirebaseUsersTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        self.export_path = os.path.join(export_dir.name, 'users.json')
+
+        # Signed up before Firebase sync linked their uid
+        Engineer.objects.create_user('linked-later@example.com', first_name='Link')
+        Engineer.objects.create_user('current@example.com', firebase_uid='current-uid', first_name='Cur', last_name='Rent')
+        Engineer.objects.create_user('taken@example.com', firebase_uid='other-uid')
+
+        self.write_export([
+            {'localId': 'new-uid', 'email': 'New@Example.com', 'displayName': 'Ada Lovelace'},
+            {'localId': 'new-uid', 'email': 'duplicate@example.com'},
+            {'localId': 'linked-uid', 'email': 'linked-later@example.com', 'displayName': 'Link Ed', 'disabled': True},
+            {'localId': 'current-uid', 'email': 'current@example.com', 'displayName': 'Cur Rent'},
+            {'localId': 'clash-uid', 'email': 'taken@example.com'},
+            {'localId': 'no-email-uid'},
+        ])
+
+    def write_export(self, users):
+        with open(self.export_path, 'w') as export_file:
+            json.dump({'users': users}, export_file)
+
+    def run_import(self):
+        out = StringIO()
+        with self.assertLogs('accounts.management.commands.import-firebase-users', 'WARNING'):
+            call_command('import-firebase-users', self.export_path, '--skip-snapshots', stdout=out)
+        return out.getvalue()
+
+    def test_counts_and_profiles(self):
+        output = self.run_import()
+
+        self.assertIn('Inserted 1, updated 1, skipped 4', output)
+        new = Engineer.objects.get(firebase_uid='new-uid')
+        self.assertEqual((new.email, new.first_name, new.last_name), ('New@example.com', 'Ada', 'Lovelace'))
+        self.assertTrue(UserProfile.objects.filter(engineer=new).exists())
+        linked = Engineer.objects.get(email='linked-later@example.com')
+        self.assertEqual((linked.firebase_uid, linked.last_name, linked.is_active), ('linked-uid', 'Ed', False))
+        self.assertEqual(Engineer.objects.get(email='taken@example.com').firebase_uid, 'other-uid')
+
+    def test_reimport_changes_nothing(self):
+        self.run_import()
+        engineers = list(Engineer.objects.order_by('pk').values())
+
+        output = self.run_import()
+
+        self.assertIn('Inserted 0, updated 0, skipped 6', output)
+        self.assertEqual(list(Engineer.objects.order_by('pk').values()), engineers)
+        self.assertEqual(UserProfile.objects.count(), Engineer.objects.count())
@@ -1,5 +1,6 @@
 from django.urls import path
 from .views import ProfileView, EngineerDetailView, sync_firebase_user, test_auth, delete_profile_photo
+from .async_views import sync_firebase_user_async, profile_async
 
 urlpatterns = [
     path('sync-firebase/', sync_firebase_user, name='sync-firebase'),
@@ -7,5 +8,9 @@ urlpatterns = [
     path('engineer/', EngineerDetailView.as_view(), name='engineer-detail'),  # New
     path('profile/', ProfileView.as_view(), name='profile'),
     path('profile/photo/delete/', delete_profile_photo, name='delete-profile-photo'),
+
+    # Async-native paths for ASGI deployments
+    path('async/sync-firebase/', sync_firebase_user_async, name='sync-firebase-async'),
+    path('async/profile/', profile_async, name='profile-async'),
     
 ]
\ No newline at end of file
@@ -7,9 +7,15 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib.auth import get_user_model
+from cloudinary import uploader
 from .models import UserProfile
 from .serializers import UserProfileSerializer, EngineerSerializer
+from .cache import get_cached_profile, set_cached_profile
+from .idempotency import idempotent
+from ProComply.conditional import conditional_on_engineer
+from ProComply.serializers import apply_sparse_fieldset
 from .service.email_service import send_welcome_email
+from ProComply.throttling import SyncThrottle, throttle_view
 
 import json
 import logging
@@ -20,6 +26,7 @@ User = get_user_model()
 
 @csrf_exempt
 @require_POST
+@throttle_view(SyncThrottle)
 def sync_firebase_user(request):
     """
     Sync Firebase user with Django user
@@ -91,7 +98,7 @@ class EngineerDetailView(APIView):
     
     def get(self, request):
         """Get current engineer info"""
-        serializer = EngineerSerializer(request.user)
+        serializer = EngineerSerializer(request.user, context={'request': request})
         return Response({
             'status': 'success',
             'data': serializer.data
@@ -124,19 +131,33 @@ class ProfileView(APIView):
     """Get/Update UserProfile with nested Engineer fields"""
     permission_classes = [IsAuthenticated]
     
+    @conditional_on_engineer('profile', depends_on_today=True)
     def get(self, request):
         """Get complete profile (Engineer + UserProfile)"""
+        serializer = UserProfileSerializer(context={'request': request})
         try:
-            profile, created = UserProfile.objects.get_or_create(engineer=request.user)
-            serializer = UserProfileSerializer(profile)
+            # Sparse reads skip the cache and only load the selected columns
+            data = None if serializer.is_sparse else get_cached_profile(request.user.pk)
+            if data is None:
+                # Profiles are created with the engineer, so reads never write
+                queryset = apply_sparse_fieldset(UserProfile.objects.select_related('engineer'), serializer)
+                serializer.instance = queryset.get(engineer=request.user)
+                data = serializer.data
+                if not serializer.is_sparse:
+                    set_cached_profile(request.user.pk, data)
             
-            logger.info(f"Profile accessed by: {request.user.email}")
+            logger.debug(f"Profile accessed by: {request.user.email}")
             
             return Response({
                 'status': 'success',
-                'data': serializer.data
+                'data': data
             })
             
+        except UserProfile.DoesNotExist:
+            return Response(
+                {'error': 'Profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             logger.error(f"Profile GET error: {str(e)}")
             return Response(
@@ -144,10 +165,12 @@ class ProfileView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @idempotent
     def put(self, request):
         """Full update of profile"""
         return self._update_profile(request, partial=False)
     
+    @idempotent
     def patch(self, request):
         """Partial update of profile"""
         return self._update_profile(request, partial=True)
@@ -193,8 +216,9 @@ def delete_profile_photo(request):
         profile = UserProfile.objects.get(engineer=request.user)
         
         if profile.profile_photo:
-            # Delete from Cloudinary
-            profile.profile_photo.delete()
+            # Delete from Cloudinary, then clear only the photo column
+            uploader.destroy(profile.profile_photo.public_id)
+            profile.profile_photo = None
             profile.save()
             
             logger.info(f"Profile photo deleted for {request.user.email}")
@@ -1,3 +1,95 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Least
 
-# Register your models here.
+from ProComply.admin_utils import LargeTableAdmin
+from .models import CPDActivity, CPDSyncState
+from .reflow import reflow_year
+from .snapshots import refresh_snapshot
+
+ACTION_CHUNK_SIZE = 1000
+
+# SQL twin of CPDActivity.calculate_pdus for bulk approvals
+RAW_PDUS = Case(
+    When(activity_type='WORK_BASED', then=Least(Value(10), F('hours_spent') / Value(100))),
+    When(activity_type='KNOWLEDGE_CONTRIBUTION', then=Least(Value(10), F('hours_spent'))),
+    default=F('hours_spent'),
+    output_field=IntegerField(),
+)
+
+
+def chunked_update(queryset, chunk_size=ACTION_CHUNK_SIZE, **updates):
+    """
+    Apply an update to a selection in primary key chunks, so each statement
+    holds row locks briefly. Each engineer's rows in a chunk share one
+    change sequence number. Returns the rows updated and the
+    (engineer_id, year) pairs they touched.
+    """
+    updated = 0
+    touched = set()
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not pks:
+            break
+        last_pk = pks[-1]
+
+        chunk = CPDActivity.objects.filter(pk__in=pks)
+        with transaction.atomic():
+            pairs = set(chunk.values_list('engineer_id', 'date_completed__year').distinct())
+            touched.update(pairs)
+            if updates:
+                for engineer_id in sorted({engineer_id for engineer_id, year in pairs}):
+                    updated += chunk.filter(engineer_id=engineer_id).update(
+                        change_seq=CPDSyncState.next_seq(engineer_id), **updates
+                    )
+    return updated, touched
+
+
+def refresh_touched_snapshots(touched):
+    for engineer_id, year in touched:
+        refresh_snapshot(engineer_id, year)
+
+
+def reflow_touched_years(touched):
+    """Re-decide the rest of each touched year against the staff decisions; refreshes snapshots too"""
+    for engineer_id, year in touched:
+        reflow_year(engineer_id, year)
+
+
+@admin.register(CPDActivity)
+class CPDActivityAdmin(LargeTableAdmin):
+    list_display = ('title', 'engineer', 'activity_type', 'date_completed', 'pdu_units_awarded', 'status')
+    list_filter = ('status', 'activity_type')
+    list_select_related = ('engineer',)
+    search_fields = ('engineer__email', 'engineer__ebk_registration_number')
+    autocomplete_fields = ('engineer',)
+    ordering = ('-id',)
+    readonly_fields = ('created_at',)
+    actions = ('approve_activities', 'reject_activities', 'recompute_snapshots')
+
+    @admin.action(description='Approve selected activities (overrides annual caps)')
+    def approve_activities(self, request, queryset):
+        updated, touched = chunked_update(
+            queryset, status='APPROVED', rejection_reason=None, pdu_units_awarded=RAW_PDUS, staff_decision=True
+        )
+        reflow_touched_years(touched)
+        self.message_user(request, f"Approved {updated} activities", messages.SUCCESS)
+
+    @admin.action(description='Reject selected activities')
+    def reject_activities(self, request, queryset):
+        updated, touched = chunked_update(
+            queryset, status='REJECTED', rejection_reason='Rejected by staff review.', pdu_units_awarded=0,
+            staff_decision=True
+        )
+        reflow_touched_years(touched)
+        self.message_user(request, f"Rejected {updated} activities", messages.SUCCESS)
+
+    @admin.action(description='Recompute compliance snapshots for selected activities')
+    def recompute_snapshots(self, request, queryset):
+        updated, touched = chunked_update(queryset)
+        refresh_touched_snapshots(touched)
+        self.message_user(request, f"Recomputed {len(touched)} compliance snapshots", messages.SUCCESS)
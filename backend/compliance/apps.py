@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class ComplianceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'compliance'
+
+    def ready(self):
+        import compliance.signals
@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Sum
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from accounts.authentication import async_login_required
+from .models import CPDActivity
+from .serializers import activity_rows
+from .views import MAX_YEAR, MIN_YEAR, build_summary, parse_year
+from ProComply.cache import aget_for_engineer, aset_for_engineer
+from datetime import date
+
+
+@require_GET
+@async_login_required
+async def cpd_activity_list_async(request):
+    """Async version of the cpd-activities list"""
+    data = await aget_for_engineer(request.user.pk, 'activities')
+    if data is None:
+        data = await sync_to_async(activity_rows)(CPDActivity.objects.filter(engineer=request.user))
+        await aset_for_engineer(request.user.pk, 'activities', data)
+    return JsonResponse(data, safe=False)
+
+
+@require_GET
+@async_login_required
+async def cpd_summary_async(request):
+    """Async version of CPDSummaryView"""
+    try:
+        year = parse_year(request.GET.get('year', date.today().year))
+    except ValueError:
+        return JsonResponse({'error': f'year must be an integer from {MIN_YEAR} to {MAX_YEAR}'}, status=400)
+
+    data = await aget_for_engineer(request.user.pk, 'summary', year)
+    if data is not None:
+        return JsonResponse(data)
+
+    category_breakdown = {code: 0 for code, label in CPDActivity.ACTIVITY_TYPE_CHOICES}
+    totals = CPDActivity.objects.filter(
+        engineer=request.user,
+        date_completed__year=year,
+        status='APPROVED'
+    ).values('activity_type').annotate(total=Sum('pdu_units_awarded'))
+
+    async for row in totals:
+        category_breakdown[row['activity_type']] = row['total'] or 0
+
+    data = build_summary(year, category_breakdown)
+    await aset_for_engineer(request.user.pk, 'summary', data, year)
+    return JsonResponse(data)
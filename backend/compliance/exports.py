@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+
+from .models import CPDActivity
+
+# (output column, ORM lookup) - engineer fields come from the same joined query
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('engineer_id', 'engineer_id'),
+    ('engineer_email', 'engineer__email'),
+    ('engineer_first_name', 'engineer__first_name'),
+    ('engineer_last_name', 'engineer__last_name'),
+    ('ebk_registration_number', 'engineer__ebk_registration_number'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('activity_type', 'activity_type'),
+    ('date_completed', 'date_completed'),
+    ('hours_spent', 'hours_spent'),
+    ('pdu_units_awarded', 'pdu_units_awarded'),
+    ('status', 'status'),
+    ('rejection_reason', 'rejection_reason'),
+    ('supporting_document_url', 'supporting_document'),
+    ('created_at', 'created_at'),
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+FLUSH_BYTES = 64 * 1024
+
+
+def filter_export_queryset(params):
+    """
+    Build the export queryset from request query params or command options.
+    Raises ValueError for a non-integer year or engineer, or a date that is
+    not YYYY-MM-DD.
+    """
+    queryset = CPDActivity.objects.all()
+
+    if params.get('year'):
+        queryset = queryset.filter(date_completed__year=int(params['year']))
+    if params.get('date_from'):
+        queryset = queryset.filter(date_completed__gte=date.fromisoformat(params['date_from']))
+    if params.get('date_to'):
+        queryset = queryset.filter(date_completed__lte=date.fromisoformat(params['date_to']))
+    if params.get('engineer'):
+        queryset = queryset.filter(engineer_id=int(params['engineer']))
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('activity_type'):
+        queryset = queryset.filter(activity_type=params['activity_type'])
+
+    # Primary key order walks the index instead of sorting millions of rows
+    return queryset.order_by('id')
+
+
+def iter_export_rows(queryset, chunk_size=2000):
+    """Rows as plain values, read through a server-side cursor"""
+    lookups = [lookup for column, lookup in EXPORT_COLUMNS]
+    for row in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        row = list(row)
+        document = row[-2]
+        row[-2] = document.url if document else None
+        yield row
+
+
+def _format_value(value):
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([column for column, lookup in EXPORT_COLUMNS])
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(['' if value is None else _format_value(value) for value in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def iter_ndjson(rows):
+    columns = [column for column, lookup in EXPORT_COLUMNS]
+    chunk = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(columns, map(_format_value, row)))) + '\n'
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(chunk).encode()
+            chunk = []
+            size = 0
+
+    if chunk:
+        yield ''.join(chunk).encode()
+
+
+def gzip_stream(chunks):
+    """Incrementally gzip a byte stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(queryset, export_format, gzip=False):
+    """Encoded export stream for a queryset in csv or ndjson"""
+    rows = iter_export_rows(queryset)
+    stream = iter_csv(rows) if export_format == 'csv' else iter_ndjson(rows)
+    return gzip_stream(stream) if gzip else stream
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from compliance.models import CPDActivity
+from compliance.exports import EXPORT_FORMATS, filter_export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream CPD activities to a CSV or NDJSON file for auditors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--file', help='Destination path (default: stdout)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--year', type=int)
+        parser.add_argument('--date-from', dest='date_from')
+        parser.add_argument('--date-to', dest='date_to')
+        parser.add_argument('--engineer', type=int, help='Engineer id')
+        parser.add_argument('--status', choices=[choice for choice, label in CPDActivity.STATUS_CHOICES])
+        parser.add_argument('--activity-type', dest='activity_type')
+
+    def handle(self, *args, **options):
+        try:
+            queryset = filter_export_queryset(options)
+        except ValueError:
+            raise CommandError('--date-from and --date-to must be YYYY-MM-DD dates')
+        stream = stream_export(queryset, options['output'], gzip=options['gzip'])
+
+        if not options['file']:
+            for chunk in stream:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(options['file'], 'wb') as export_file:
+            for chunk in stream:
+                export_file.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['file']}"))
@@ -0,0 +1,187 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import Engineer, UserProfile
+from compliance import rules
+from compliance.models import CPDActivity, CPDSyncState
+from compliance.snapshots import rebuild_snapshots
+
+SPECIALIZATIONS = [
+    'Civil', 'Structural', 'Mechanical', 'Electrical', 'Chemical',
+    'Geotechnical', 'Water Resources', 'Transportation', 'Agricultural', None,
+]
+
+# Relative frequency of each activity type and the hours range it is drawn from
+DEFAULT_TYPE_WEIGHTS = {
+    'EBK_ORGANIZED': 3,
+    'PARTICIPATION': 2,
+    'PRESENTATION': 1,
+    'KNOWLEDGE_CONTRIBUTION': 1,
+    'WORK_BASED': 2,
+    'INFORMAL': 4,
+    'ACCREDITED_PROVIDER': 3,
+}
+HOURS_RANGE = {'WORK_BASED': (20, 600)}
+DEFAULT_HOURS_RANGE = (1, 16)
+
+
+def parse_type_weights(value):
+    """'INFORMAL=4,WORK_BASED=1' -> {type: weight}; unspecified types keep their default"""
+    weights = dict(DEFAULT_TYPE_WEIGHTS)
+    for item in filter(None, value.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in weights or not weight.isdigit():
+            raise CommandError(f"Bad type weight '{item}' (expected TYPE=integer)")
+        weights[name] = int(weight)
+    return weights
+
+
+class Command(BaseCommand):
+    help = 'Generate engineers, profiles and CPD activities at volume for scale testing (deterministic by seed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engineers', type=int, default=1000)
+        parser.add_argument('--years', type=int, default=3, help='Years of history ending with the current year')
+        parser.add_argument('--activities-per-year', type=int, default=12, help='Mean activities per engineer per year')
+        parser.add_argument('--type-weights', default='', help='e.g. INFORMAL=4,WORK_BASED=1')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--offset', type=int, default=0, help='Index of the first engineer, to add to an earlier run with the same seed'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Engineers generated per transaction')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT')
+        parser.add_argument('--skip-snapshots', action='store_true', help='Do not rebuild compliance snapshots afterwards')
+
+    def handle(self, *args, **options):
+        weights = parse_type_weights(options['type_weights'])
+        self.types = list(weights)
+        self.cum_weights = []
+        total = 0
+        for activity_type in self.types:
+            total += weights[activity_type]
+            self.cum_weights.append(total)
+        if not total:
+            raise CommandError('At least one activity type needs a positive weight')
+
+        self.check_free_indices(options['seed'], options['offset'], options['engineers'])
+
+        self.rng = random.Random(options['seed'])
+        self.today = date.today()
+        self.years = list(range(self.today.year - options['years'] + 1, self.today.year + 1))
+        self.password = make_password(None)
+
+        started = time.monotonic()
+        counts = {'engineers': 0, 'activities': 0}
+        chunk_size = options['chunk_size']
+        for start in range(0, options['engineers'], chunk_size):
+            count = min(chunk_size, options['engineers'] - start)
+            created = self.generate_chunk(options['seed'], options['offset'] + start, count, options)
+            counts['engineers'] += count
+            counts['activities'] += created
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{counts['engineers']}/{options['engineers']} engineers, "
+                f"{counts['activities']} activities ({counts['activities'] / elapsed:,.0f} rows/s)"
+            )
+
+        if not options['skip_snapshots']:
+            for year in self.years:
+                rebuild_snapshots(year)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {counts['engineers']} engineers and {counts['activities']} activities "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def check_free_indices(self, seed, offset, count):
+        """Emails derive from seed and index, so refuse to reuse an index an earlier run took"""
+        prefix = f'synthetic-{seed}-'
+        taken = [
+            int(email[len(prefix):].partition('@')[0])
+            for email in Engineer.objects.filter(email__startswith=prefix).values_list('email', flat=True).iterator()
+        ]
+        if any(offset <= index < offset + count for index in taken):
+            raise CommandError(
+                f"Synthetic engineers for seed {seed} already exist (indices up to {max(taken)}); "
+                f"use --offset {max(taken) + 1} or another --seed"
+            )
+
+    @transaction.atomic
+    def generate_chunk(self, seed, start, count, options):
+        rng = self.rng
+        engineers = Engineer.objects.bulk_create([
+            Engineer(
+                email=f'synthetic-{seed}-{start + i}@example.com',
+                first_name=f'Engineer{start + i}',
+                last_name=f'Seed{seed}',
+                password=self.password,
+            )
+            for i in range(count)
+        ], batch_size=options['batch_size'])
+
+        # bulk_create skips post_save, so profiles and sync state are created here
+        UserProfile.objects.bulk_create(
+            [UserProfile(
+                engineer_id=engineer.pk,
+                license_expiry_date=self.license_expiry_date(),
+                engineering_specialization=rng.choice(SPECIALIZATIONS),
+            ) for engineer in engineers],
+            batch_size=options['batch_size']
+        )
+
+        activities, sync_states = [], []
+        for engineer in engineers:
+            seq = 0
+            for year in self.years:
+                for activity in self.year_activities(engineer.pk, year, options['activities_per_year']):
+                    seq += 1
+                    activity.change_seq = seq
+                    activities.append(activity)
+            sync_states.append(CPDSyncState(engineer_id=engineer.pk, last_seq=seq))
+
+        CPDActivity.objects.bulk_create(activities, batch_size=options['batch_size'])
+        CPDSyncState.objects.bulk_create(sync_states, batch_size=options['batch_size'])
+        return len(activities)
+
+    def license_expiry_date(self):
+        """Mostly valid, with some expired, expiring soon or missing"""
+        roll = self.rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.25:
+            return self.today - timedelta(days=self.rng.randint(1, 730))
+        if roll < 0.35:
+            return self.today + timedelta(days=self.rng.randint(0, 60))
+        return self.today + timedelta(days=self.rng.randint(61, 1095))
+
+    def year_activities(self, engineer_id, year, mean):
+        """One engineer's activities for a year, capped the way validate_and_approve would in date order"""
+        rng = self.rng
+        last_day = (self.today if year == self.today.year else date(year, 12, 31)) - date(year, 1, 1)
+        count = rng.randint(0, 2 * mean)
+        types = rng.choices(self.types, cum_weights=self.cum_weights, k=count)
+        dates = sorted(date(year, 1, 1) + timedelta(days=rng.randint(0, last_day.days)) for _ in range(count))
+
+        totals = {}
+        activities = []
+        for index, (activity_type, date_completed) in enumerate(zip(types, dates)):
+            hours = rng.randint(*HOURS_RANGE.get(activity_type, DEFAULT_HOURS_RANGE))
+            status, pdus, reason = rules.evaluate(activity_type, hours, totals)
+            rules.apply(totals, activity_type, status, pdus)
+            activities.append(CPDActivity(
+                engineer_id=engineer_id,
+                title=f'{activity_type.replace("_", " ").title()} {year}-{index + 1}',
+                description='Synthetic activity generated for scale testing',
+                activity_type=activity_type,
+                date_completed=date_completed,
+                hours_spent=hours,
+                pdu_units_awarded=pdus,
+                status=status,
+                rejection_reason=reason,
+            ))
+        return activities
@@ -0,0 +1,19 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from compliance.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild compliance snapshots for every engineer (run yearly and after bulk imports)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, action='append', help='Year to rebuild (repeatable, default: current year)')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        years = options['year'] or [date.today().year]
+        for year in years:
+            written = rebuild_snapshots(year, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} compliance snapshots for {year}'))
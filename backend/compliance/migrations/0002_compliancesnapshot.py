@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplianceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('pdus_earned', models.PositiveIntegerField(default=0)),
+                ('pdus_required', models.PositiveIntegerField(default=50)),
+                ('pdus_remaining', models.PositiveIntegerField(default=50)),
+                ('activity_count', models.PositiveIntegerField(default=0)),
+                ('last_activity_date', models.DateField(blank=True, null=True)),
+                ('license_expiry_date', models.DateField(blank=True, null=True)),
+                ('engineering_specialization', models.CharField(blank=True, max_length=100, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('engineer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compliance_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-pdus_remaining', 'engineer_id'],
+                'indexes': [models.Index(fields=['year', 'pdus_remaining'], name='snapshot_year_remaining_idx'), models.Index(fields=['year', 'license_expiry_date'], name='snapshot_year_expiry_idx'), models.Index(fields=['year', 'engineering_specialization'], name='snapshot_year_spec_idx')],
+                'constraints': [models.UniqueConstraint(fields=('engineer', 'year'), name='unique_compliance_snapshot')],
+            },
+        ),
+    ]
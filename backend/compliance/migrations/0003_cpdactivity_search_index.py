@@ -0,0 +1,17 @@
+# Full-text index over CPD activity titles and descriptions; the SQL lives in
+# compliance.search_index so later migrations can restore the SQLite triggers.
+
+from django.db import migrations
+
+from compliance.search_index import create_search_index, drop_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0002_compliancesnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from compliance.search_index import restore_sqlite_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0003_cpdactivity_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Altering compliance_cpdactivity rebuilds it on SQLite and drops the search triggers
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='cpdactivity',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='cpdactivity',
+            index=models.Index(fields=['engineer', 'change_seq'], name='cpd_engineer_change_seq_idx'),
+        ),
+        migrations.CreateModel(
+            name='CPDSyncState',
+            fields=[
+                ('engineer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cpd_sync_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seq', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CPDActivityTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_id', models.PositiveBigIntegerField()),
+                ('change_seq', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('engineer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cpd_activity_tombstones', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['engineer', 'change_seq'], name='cpd_tombstone_change_seq_idx')],
+            },
+        ),
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+    ]
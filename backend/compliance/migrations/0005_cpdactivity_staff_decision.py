@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:12
+
+from django.db import migrations, models
+
+from compliance.search_index import restore_sqlite_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0004_cpd_sync_feed'),
+    ]
+
+    # Altering compliance_cpdactivity rebuilds it on SQLite and drops the search triggers
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='cpdactivity',
+            name='staff_decision',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from datetime import date, timedelta
+
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from cloudinary.models import CloudinaryField
 from accounts.models import Engineer
+from . import rules
 
 class CPDActivity(models.Model):
     ACTIVITY_TYPE_CHOICES = [
@@ -19,6 +22,9 @@ class CPDActivity(models.Model):
         ('REJECTED', 'Rejected'),
     ]
 
+    # EBK annual PDU limits per category
+    MAX_PDUS_PER_CATEGORY = rules.MAX_PDUS_PER_CATEGORY
+
     engineer = models.ForeignKey(Engineer, on_delete=models.CASCADE, related_name='cpd_activities')
     
     # Activity details
@@ -41,115 +47,141 @@ class CPDActivity(models.Model):
     pdu_units_awarded = models.PositiveIntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='APPROVED')
     rejection_reason = models.TextField(blank=True, null=True)
+    # Set by the admin approve/reject actions; reflows keep the staff decision
+    staff_decision = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # Per-engineer change sequence for the delta sync feed, bumped on every write
+    change_seq = models.PositiveBigIntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['-date_completed']
         verbose_name = "CPD Activity"
         verbose_name_plural = "CPD Activities"
+        indexes = [
+            models.Index(fields=['engineer', 'change_seq'], name='cpd_engineer_change_seq_idx'),
+        ]
 
     def __str__(self):
         return f"{self.engineer.email} - {self.title}"
 
     def calculate_pdus(self):
         """Calculate PDUs based on EBK rules"""
-        activity_type = self.activity_type
-        hours = self.hours_spent
-
-        if activity_type == 'WORK_BASED':
-            # 1 PDU per 100 hours, max 10 PDUs
-            return min(hours // 100, 10)
-        
-        elif activity_type == 'KNOWLEDGE_CONTRIBUTION':
-            
-            return min(hours, 10)
-        
-        else:
-            # For most structured activities: 1 hour = 1 PDU (capped by category)
-            return hours
+        return rules.calculate_pdus(self.activity_type, self.hours_spent)
 
     def validate_and_approve(self):
-        """Auto-validate against EBK annual limits"""
-        year = self.date_completed.year
-        engineer = self.engineer
-
-        # Step 1: Calculate raw PDUs
-        raw_pdus = self.calculate_pdus()
-        if raw_pdus <= 0:
-            self.status = 'REJECTED'
-            self.rejection_reason = "No valid PDUs calculated."
-            return  
-
-
-        # Step 2: Check annual limits
-        MAX_PDUS_PER_CATEGORY = {
-            'EBK_ORGANIZED': 10,
-            'PARTICIPATION': 5,
-            'PRESENTATION': 10,
-            'KNOWLEDGE_CONTRIBUTION': 10,
-            'WORK_BASED': 10,
-            'INFORMAL': 10,
-            'ACCREDITED_PROVIDER': 25,
-        }
-        
-        category_limit = MAX_PDUS_PER_CATEGORY.get(self.activity_type, 10)
-        current_category_pdus = CPDActivity.objects.filter(
-            engineer=engineer,
-            activity_type=self.activity_type,
-            date_completed__year=year,
-            status='APPROVED'
-        ).aggregate(total=models.Sum('pdu_units_awarded'))['total'] or 0
-
-        allowed_in_category = max(0, category_limit - current_category_pdus)
-        pdus_after_category = min(raw_pdus, allowed_in_category)
-
-        if pdus_after_category <= 0:
-            self.status = 'REJECTED'
-            self.rejection_reason = f"Exceeds annual limit for this activity type ({category_limit} PDUs)."
-            return
-
-        # Step 3: Structured vs Unstructured limits
-        is_structured = self.activity_type != 'INFORMAL'
-        total_structured = CPDActivity.objects.filter(
-            engineer=engineer,
-            date_completed__year=year,
-            status='APPROVED',
-            activity_type__in=[
-                'EBK_ORGANIZED', 'PARTICIPATION', 'PRESENTATION',
-                'KNOWLEDGE_CONTRIBUTION', 'WORK_BASED', 'ACCREDITED_PROVIDER'
-            ]
-        ).aggregate(total=models.Sum('pdu_units_awarded'))['total'] or 0
-
-        total_unstructured = CPDActivity.objects.filter(
-            engineer=engineer,
-            date_completed__year=year,
-            status='APPROVED',
-            activity_type='INFORMAL'
-        ).aggregate(total=models.Sum('pdu_units_awarded'))['total'] or 0
-
-        # EBK: Max 40 structured + 10 unstructured = 50 total
-        if is_structured:
-            final_pdus = min(pdus_after_category, 40 - total_structured)
-        else:
-            final_pdus = min(pdus_after_category, 10 - total_unstructured)
-
-        if final_pdus <= 0:
-            self.status = 'REJECTED'
-            self.rejection_reason = "Exceeds annual CPD limit (max 50 PDUs: 40 structured + 10 unstructured)."
-            return
-
-        # Approve!
-        self.pdu_units_awarded = final_pdus
-        self.status = 'APPROVED'
-        self.rejection_reason = None
+        """Auto-validate against EBK annual limits, counting only activities up to its date"""
+        # A new row sorts last on its date, so same-day activities count too
+        totals = approved_totals(
+            self.engineer_id, self.date_completed.year, before=self.date_completed + timedelta(days=1)
+        )
+        self.status, awarded, self.rejection_reason = rules.evaluate(self.activity_type, self.hours_spent, totals)
+        if self.status == 'APPROVED':
+            self.pdu_units_awarded = awarded
 
     def save(self, *args, **kwargs):
         if not self.pk:  # Only on creation
             self.validate_and_approve()
-        super().save(*args, **kwargs)
-                  
+        with transaction.atomic():
+            self.change_seq = CPDSyncState.next_seq(self.engineer_id)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
+
+
+def approved_totals(engineer_id, year, before=None):
+    """{activity_type: approved PDUs} for a year (dates before ``before`` only, if given) from one grouped query"""
+    queryset = CPDActivity.objects.filter(
+        engineer_id=engineer_id,
+        date_completed__gte=date(year, 1, 1),
+        date_completed__lt=before or date(year + 1, 1, 1),
+        status='APPROVED'
+    )
+    return {
+        row['activity_type']: row['total'] or 0
+        for row in queryset.order_by().values('activity_type').annotate(total=models.Sum('pdu_units_awarded'))
+    }
+
 
+class CPDSyncState(models.Model):
+    """Last change sequence number handed out for an engineer's activities"""
+    engineer = models.OneToOneField(Engineer, on_delete=models.CASCADE, primary_key=True, related_name='cpd_sync_state')
+    last_seq = models.PositiveBigIntegerField(default=0)
 
+    def __str__(self):
+        return f"{self.engineer_id}: {self.last_seq}"
+
+    @classmethod
+    def next_seq(cls, engineer_id):
+        """
+        Reserve the engineer's next sequence number. Must run inside the
+        transaction that writes the change: the row lock makes sequence
+        order match commit order, so a cursor never skips a late commit.
+        """
+        state, created = cls.objects.select_for_update().get_or_create(engineer_id=engineer_id)
+        state.last_seq += 1
+        state.save(update_fields=['last_seq'])
+        return state.last_seq
+
+
+class CPDActivityTombstone(models.Model):
+    """Marks a deleted activity so sync clients can drop it"""
+    engineer = models.ForeignKey(Engineer, on_delete=models.CASCADE, related_name='cpd_activity_tombstones')
+    activity_id = models.PositiveBigIntegerField()
+    change_seq = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['engineer', 'change_seq'], name='cpd_tombstone_change_seq_idx'),
+        ]
 
+    def __str__(self):
+        return f"{self.engineer_id} - {self.activity_id} (deleted)"
+
+
+class ComplianceSnapshot(models.Model):
+    """Precomputed compliance totals per (engineer, year) for staff dashboards"""
+    engineer = models.ForeignKey(Engineer, on_delete=models.CASCADE, related_name='compliance_snapshots')
+    year = models.PositiveSmallIntegerField()
+
+    # Totals over the year's approved activities
+    pdus_earned = models.PositiveIntegerField(default=0)
+    pdus_required = models.PositiveIntegerField(default=50)
+    pdus_remaining = models.PositiveIntegerField(default=50)
+    activity_count = models.PositiveIntegerField(default=0)
+    last_activity_date = models.DateField(blank=True, null=True)
+
+    # Copied from UserProfile so staff filters never join it
+    license_expiry_date = models.DateField(blank=True, null=True)
+    engineering_specialization = models.CharField(max_length=100, blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-pdus_remaining', 'engineer_id']
+        constraints = [
+            models.UniqueConstraint(fields=['engineer', 'year'], name='unique_compliance_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'pdus_remaining'], name='snapshot_year_remaining_idx'),
+            models.Index(fields=['year', 'license_expiry_date'], name='snapshot_year_expiry_idx'),
+            models.Index(fields=['year', 'engineering_specialization'], name='snapshot_year_spec_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.engineer_id} - {self.year}: {self.pdus_earned}/{self.pdus_required}"
+
+    @property
+    def license_status(self):
+        if not self.license_expiry_date:
+            return "No license information"
+        from datetime import date
+        if self.license_expiry_date < date.today():
+            return "Expired"
+        elif (self.license_expiry_date - date.today()).days <= 60:
+            return "Expiring Soon"
+        else:
+            return "Valid"
 
@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.db import transaction
+
+from . import rules
+from .models import CPDActivity, CPDSyncState, approved_totals
+from .snapshots import refresh_snapshot
+
+REFLOW_FIELDS = ['status', 'pdu_units_awarded', 'rejection_reason', 'change_seq']
+
+
+def reflow_year(engineer_id, year, start_date=None):
+    """
+    Replay the annual caps over an engineer's activities in (date, id) order
+    from ``start_date`` to the end of the year, starting from the approved
+    totals before it. Staff decisions are kept and count towards the caps.
+    Only rows whose decision changes are written, in one bulk update sharing
+    one change sequence number, and the year's snapshot is refreshed.
+    Returns the rows updated.
+    """
+    start_date = max(start_date or date(year, 1, 1), date(year, 1, 1))
+    with transaction.atomic():
+        # Taken first: the sync state row lock serializes writes per engineer
+        seq = CPDSyncState.next_seq(engineer_id)
+        totals = approved_totals(engineer_id, year, before=start_date)
+        activities = CPDActivity.objects.filter(
+            engineer_id=engineer_id,
+            date_completed__gte=start_date,
+            date_completed__lt=date(year + 1, 1, 1)
+        ).order_by('date_completed', 'id').only(
+            'id', 'engineer_id', 'activity_type', 'hours_spent', 'date_completed', 'staff_decision', *REFLOW_FIELDS
+        )
+
+        changed = []
+        for activity in activities:
+            if activity.staff_decision:
+                rules.apply(totals, activity.activity_type, activity.status, activity.pdu_units_awarded)
+                continue
+            status, pdus, reason = rules.evaluate(activity.activity_type, activity.hours_spent, totals)
+            rules.apply(totals, activity.activity_type, status, pdus)
+            if (status, pdus, reason) != (activity.status, activity.pdu_units_awarded, activity.rejection_reason):
+                activity.status, activity.pdu_units_awarded, activity.rejection_reason = status, pdus, reason
+                changed.append(activity)
+
+        if changed:
+            for activity in changed:
+                activity.change_seq = seq
+            CPDActivity.objects.bulk_update(changed, REFLOW_FIELDS, batch_size=500)
+        # Also covers an activity moved out of or deleted from this year
+        refresh_snapshot(engineer_id, year)
+    return len(changed)
+
+
+def reflow_after_change(engineer_id, old_date, new_date=None):
+    """
+    Reflow the year(s) an activity moved out of and into after an edit or
+    delete. A create passes its date alone and reflows from there.
+    """
+    if new_date is None or old_date.year != new_date.year:
+        updated = reflow_year(engineer_id, old_date.year, old_date)
+        if new_date is not None:
+            updated += reflow_year(engineer_id, new_date.year, new_date)
+        return updated
+    return reflow_year(engineer_id, old_date.year, min(old_date, new_date))
@@ -0,0 +1,72 @@
+"""
+EBK annual PDU rules as pure functions over per-category approved totals,
+shared by saves, reflows and what-if simulations. Nothing here queries.
+"""
+
+# EBK annual PDU limits per category
+MAX_PDUS_PER_CATEGORY = {
+    'EBK_ORGANIZED': 10,
+    'PARTICIPATION': 5,
+    'PRESENTATION': 10,
+    'KNOWLEDGE_CONTRIBUTION': 10,
+    'WORK_BASED': 10,
+    'INFORMAL': 10,
+    'ACCREDITED_PROVIDER': 25,
+}
+DEFAULT_CATEGORY_LIMIT = 10
+
+# EBK: Max 40 structured + 10 unstructured = 50 total
+STRUCTURED_LIMIT = 40
+UNSTRUCTURED_LIMIT = 10
+UNSTRUCTURED_TYPES = {'INFORMAL'}
+
+NO_PDUS_REASON = "No valid PDUs calculated."
+ANNUAL_LIMIT_REASON = "Exceeds annual CPD limit (max 50 PDUs: 40 structured + 10 unstructured)."
+
+
+def category_limit_reason(limit):
+    return f"Exceeds annual limit for this activity type ({limit} PDUs)."
+
+
+def calculate_pdus(activity_type, hours):
+    """Calculate PDUs based on EBK rules"""
+    if activity_type == 'WORK_BASED':
+        # 1 PDU per 100 hours, max 10 PDUs
+        return min(hours // 100, 10)
+    elif activity_type == 'KNOWLEDGE_CONTRIBUTION':
+        return min(hours, 10)
+    else:
+        # For most structured activities: 1 hour = 1 PDU (capped by category)
+        return hours
+
+
+def evaluate(activity_type, hours, totals):
+    """
+    Decide one activity against ``totals`` ({activity_type: approved PDUs}
+    for the year so far). Returns (status, pdu_units_awarded, rejection_reason).
+    """
+    raw_pdus = calculate_pdus(activity_type, hours)
+    if raw_pdus <= 0:
+        return 'REJECTED', 0, NO_PDUS_REASON
+
+    category_limit = MAX_PDUS_PER_CATEGORY.get(activity_type, DEFAULT_CATEGORY_LIMIT)
+    pdus = min(raw_pdus, max(0, category_limit - totals.get(activity_type, 0)))
+    if pdus <= 0:
+        return 'REJECTED', 0, category_limit_reason(category_limit)
+
+    unstructured = sum(totals.get(code, 0) for code in UNSTRUCTURED_TYPES)
+    if activity_type in UNSTRUCTURED_TYPES:
+        pdus = min(pdus, UNSTRUCTURED_LIMIT - unstructured)
+    else:
+        pdus = min(pdus, STRUCTURED_LIMIT - (sum(totals.values()) - unstructured))
+    if pdus <= 0:
+        return 'REJECTED', 0, ANNUAL_LIMIT_REASON
+
+    return 'APPROVED', pdus, None
+
+
+def apply(totals, activity_type, status, pdus):
+    """Add an evaluated activity to the running totals"""
+    if status == 'APPROVED':
+        totals[activity_type] = totals.get(activity_type, 0) + pdus
+    return totals
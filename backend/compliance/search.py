@@ -0,0 +1,106 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import CPDActivity
+
+SEARCH_TERM_RE = re.compile(r'\w+')
+
+POSTGRES_SEARCH_SQL = """
+    SELECT id FROM compliance_cpdactivity, websearch_to_tsquery('english', %s) query
+    WHERE search_vector @@ query {engineer_filter}
+    ORDER BY ts_rank(search_vector, query) DESC, id DESC
+    LIMIT %s OFFSET %s
+"""
+POSTGRES_COUNT_SQL = """
+    SELECT COUNT(*) FROM compliance_cpdactivity
+    WHERE search_vector @@ websearch_to_tsquery('english', %s) {engineer_filter}
+"""
+
+# bm25() is lower-is-better; titles weigh twice as much as descriptions
+SQLITE_SEARCH_SQL = """
+    SELECT a.id FROM compliance_cpdactivity_fts f
+    JOIN compliance_cpdactivity a ON a.id = f.rowid
+    WHERE compliance_cpdactivity_fts MATCH %s {engineer_filter}
+    ORDER BY bm25(compliance_cpdactivity_fts, 2.0, 1.0), a.id DESC
+    LIMIT %s OFFSET %s
+"""
+SQLITE_COUNT_SQL = """
+    SELECT COUNT(*) FROM compliance_cpdactivity_fts f
+    JOIN compliance_cpdactivity a ON a.id = f.rowid
+    WHERE compliance_cpdactivity_fts MATCH %s {engineer_filter}
+"""
+
+SEARCH_SQL = {
+    'postgresql': (POSTGRES_SEARCH_SQL, POSTGRES_COUNT_SQL, 'AND engineer_id = %s'),
+    'sqlite': (SQLITE_SEARCH_SQL, SQLITE_COUNT_SQL, 'AND a.engineer_id = %s'),
+}
+
+
+def fts5_query(text):
+    """Quote each word as an FTS5 prefix term so user input cannot break MATCH syntax"""
+    return ' '.join(f'"{term}"*' for term in SEARCH_TERM_RE.findall(text))
+
+
+class ActivitySearch:
+    """
+    Ranked full-text search over CPD activity titles and descriptions.
+
+    Supports ``count()`` and slicing so it can be handed straight to a
+    paginator; each slice runs one ranked query against the index created
+    in migration 0003. Backends without an index fall back to LIKE.
+    """
+    def __init__(self, text, engineer_id=None):
+        self.text = text
+        self.engineer_id = engineer_id
+        self.vendor = connection.vendor
+        self.term = fts5_query(text) if self.vendor == 'sqlite' else text
+
+    def _run(self, sql, extra_params=()):
+        search_sql, count_sql, engineer_filter = SEARCH_SQL[self.vendor]
+        params = [self.term]
+        if self.engineer_id is not None:
+            params.append(self.engineer_id)
+        else:
+            engineer_filter = ''
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(engineer_filter=engineer_filter), params + list(extra_params))
+            return cursor.fetchall()
+
+    def _fallback(self):
+        queryset = CPDActivity.objects.filter(
+            Q(title__icontains=self.text) | Q(description__icontains=self.text)
+        )
+        if self.engineer_id is not None:
+            queryset = queryset.filter(engineer_id=self.engineer_id)
+        return queryset.order_by('-date_completed', '-id')
+
+    def count(self):
+        if self.vendor not in SEARCH_SQL:
+            return self._fallback().count()
+        if not self.term:
+            return 0
+        return self._run(SEARCH_SQL[self.vendor][1])[0][0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+
+        if self.vendor not in SEARCH_SQL:
+            return list(self._fallback().select_related('engineer')[key])
+        if not self.term:
+            return []
+
+        offset = key.start or 0
+        limit = key.stop - offset if key.stop is not None else -1
+        if self.vendor == 'postgresql' and limit < 0:
+            limit = None
+
+        ids = [row[0] for row in self._run(SEARCH_SQL[self.vendor][0], [limit, offset])]
+        activities = CPDActivity.objects.select_related('engineer').in_bulk(ids)
+        return [activities[pk] for pk in ids if pk in activities]
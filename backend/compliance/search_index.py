@@ -0,0 +1,94 @@
+"""
+Full-text index over CPD activity titles and descriptions, created by
+migration 0003. PostgreSQL gets a generated tsvector column with a GIN
+index; SQLite gets an FTS5 external-content table kept in sync by triggers.
+Other backends fall back to unindexed LIKE searches in compliance.search.
+
+Kept outside the migrations so later migrations can reuse it.
+"""
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE compliance_cpdactivity ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX cpdactivity_search_idx ON compliance_cpdactivity USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS cpdactivity_search_idx",
+    "ALTER TABLE compliance_cpdactivity DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE compliance_cpdactivity_fts USING fts5(
+        title, description, content='compliance_cpdactivity', content_rowid='id'
+    )
+"""
+
+# SQLite rebuilds a table for most ALTERs and drops its triggers on the way,
+# so migrations that alter compliance_cpdactivity call restore_sqlite_triggers
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER compliance_cpdactivity_fts_insert AFTER INSERT ON compliance_cpdactivity BEGIN
+        INSERT INTO compliance_cpdactivity_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER compliance_cpdactivity_fts_delete AFTER DELETE ON compliance_cpdactivity BEGIN
+        INSERT INTO compliance_cpdactivity_fts(compliance_cpdactivity_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER compliance_cpdactivity_fts_update AFTER UPDATE OF title, description ON compliance_cpdactivity BEGIN
+        INSERT INTO compliance_cpdactivity_fts(compliance_cpdactivity_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO compliance_cpdactivity_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS compliance_cpdactivity_fts_insert",
+    "DROP TRIGGER IF EXISTS compliance_cpdactivity_fts_delete",
+    "DROP TRIGGER IF EXISTS compliance_cpdactivity_fts_update",
+]
+
+SQLITE_REBUILD = "INSERT INTO compliance_cpdactivity_fts(compliance_cpdactivity_fts) VALUES ('rebuild')"
+
+SQLITE_FORWARD = [SQLITE_TABLE, *SQLITE_TRIGGERS, SQLITE_REBUILD]
+SQLITE_REVERSE = [*SQLITE_DROP_TRIGGERS, "DROP TABLE IF EXISTS compliance_cpdactivity_fts"]
+
+STATEMENTS = {
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_REVERSE),
+    'sqlite': (SQLITE_FORWARD, SQLITE_REVERSE),
+}
+
+
+def run_statements(schema_editor, index):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[index]:
+            schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, 1)
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    """Recreate the FTS5 sync triggers after a table rebuild and reindex what they missed"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in [*SQLITE_DROP_TRIGGERS, *SQLITE_TRIGGERS, SQLITE_REBUILD]:
+        schema_editor.execute(sql)
@@ -1,11 +1,22 @@
+from operator import itemgetter
+
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.utils import timezone
 from rest_framework import serializers
-from .models import CPDActivity
+from ProComply.serializers import SparseFieldsetMixin
+from .models import CPDActivity, ComplianceSnapshot
 
-class CPDActivitySerializer(serializers.ModelSerializer):
+class CPDActivitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     engineer_email = serializers.ReadOnlyField(source='engineer.email')
     engineer_name = serializers.SerializerMethodField()
     supporting_document_url = serializers.SerializerMethodField()
 
+    field_columns = {
+        'engineer_name': ['engineer__first_name', 'engineer__last_name'],
+        'supporting_document_url': ['supporting_document'],
+    }
+
     class Meta:
         model = CPDActivity
         fields = [
@@ -31,4 +42,102 @@ class CPDActivitySerializer(serializers.ModelSerializer):
         from datetime import date
         if value > date.today():
             raise serializers.ValidationError("Date cannot be in the future.")
-        return value
\ No newline at end of file
+        return value
+
+
+class CPDSimulationSerializer(serializers.Serializer):
+    """A planned activity for the what-if endpoint; nothing is saved"""
+    title = serializers.CharField(required=False, allow_blank=True)
+    activity_type = serializers.ChoiceField(choices=CPDActivity.ACTIVITY_TYPE_CHOICES)
+    hours_spent = serializers.IntegerField(min_value=0)
+    # Planned activities may be in the future
+    date_completed = serializers.DateField(required=False)
+
+
+# Output field -> values_list() columns it reads
+ACTIVITY_ROW_FIELDS = {
+    'id': ('id',),
+    'engineer_email': ('engineer__email',),
+    'engineer_name': ('engineer_id', 'engineer__first_name', 'engineer__last_name'),
+    'title': ('title',),
+    'description': ('description',),
+    'activity_type': ('activity_type',),
+    'date_completed': ('date_completed',),
+    'hours_spent': ('hours_spent',),
+    'supporting_document': ('document_path',),
+    'supporting_document_url': ('document_path',),
+    'pdu_units_awarded': ('pdu_units_awarded',),
+    'status': ('status',),
+    'rejection_reason': ('rejection_reason',),
+    'created_at': ('created_at',),
+}
+
+
+def activity_rows(queryset, fields=None):
+    """
+    Read-only fast path that builds the same dicts as CPDActivitySerializer
+    from values_list() tuples, skipping model instances and per-field
+    serializer calls. Engineer names and the timezone are computed once.
+    With ``fields`` only the columns those fields need are selected.
+    """
+    fields = [name for name in fields or ACTIVITY_ROW_FIELDS if name in ACTIVITY_ROW_FIELDS]
+    columns = list(dict.fromkeys(column for name in fields for column in ACTIVITY_ROW_FIELDS[name]))
+
+    tz = timezone.get_current_timezone()
+    document_field = CPDActivity._meta.get_field('supporting_document')
+    names = {}
+
+    def engineer_name(row):
+        name = names.get(row['engineer_id'])
+        if name is None:
+            name = names[row['engineer_id']] = f"{row['engineer__first_name']} {row['engineer__last_name']}"
+        return name
+
+    def created_at(row):
+        created = row['created_at'].astimezone(tz).isoformat()
+        return created[:-6] + 'Z' if created.endswith('+00:00') else created
+
+    def document_url(row):
+        document = row['document_path']
+        return document_field.to_python(document).url if document else None
+
+    converters = {
+        'engineer_email': lambda row: row['engineer__email'],
+        'engineer_name': engineer_name,
+        'date_completed': lambda row: row['date_completed'].isoformat(),
+        'supporting_document': lambda row: row['document_path'],
+        'supporting_document_url': document_url,
+        'created_at': created_at,
+    }
+    getters = [(name, converters.get(name) or itemgetter(name)) for name in fields]
+
+    if 'document_path' in columns:
+        # Cast skips CloudinaryField's per-row resource conversion
+        queryset = queryset.annotate(document_path=Cast('supporting_document', CharField()))
+
+    rows = []
+    for values in queryset.values_list(*columns):
+        row = dict(zip(columns, values))
+        rows.append({name: get(row) for name, get in getters})
+    return rows
+
+
+class ComplianceSnapshotSerializer(serializers.ModelSerializer):
+    engineer_id = serializers.ReadOnlyField(source='engineer.id')
+    engineer_email = serializers.ReadOnlyField(source='engineer.email')
+    engineer_name = serializers.SerializerMethodField()
+    ebk_registration_number = serializers.ReadOnlyField(source='engineer.ebk_registration_number')
+    license_status = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ComplianceSnapshot
+        fields = [
+            'engineer_id', 'engineer_email', 'engineer_name', 'ebk_registration_number',
+            'year', 'pdus_earned', 'pdus_required', 'pdus_remaining', 'activity_count',
+            'last_activity_date', 'license_expiry_date', 'license_status',
+            'engineering_specialization', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_engineer_name(self, obj):
+        return f"{obj.engineer.first_name} {obj.engineer.last_name}"
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import Engineer, UserProfile
+from .models import CPDActivity, CPDActivityTombstone, CPDSyncState
+from .snapshots import refresh_snapshot, snapshot_refresh_suppressed, sync_snapshot_profile_fields
+
+SNAPSHOT_PROFILE_FIELDS = {'license_expiry_date', 'engineering_specialization'}
+
+
+def deleting_engineer(origin):
+    """Whether a delete cascaded from one engineer or a queryset of them (e.g. the admin action)"""
+    return isinstance(origin, Engineer) or getattr(origin, 'model', None) is Engineer
+
+@receiver(post_save, sender=CPDActivity)
+@receiver(post_delete, sender=CPDActivity)
+def refresh_activity_snapshot(sender, instance, origin=None, **kwargs):
+    # Deleting the engineer removes their snapshots too; reflows refresh their own
+    if deleting_engineer(origin) or snapshot_refresh_suppressed():
+        return
+    refresh_snapshot(instance.engineer_id, instance.date_completed.year)
+
+@receiver(post_delete, sender=CPDActivity)
+def record_activity_tombstone(sender, instance, origin=None, **kwargs):
+    if deleting_engineer(origin):
+        return
+    CPDActivityTombstone.objects.create(
+        engineer_id=instance.engineer_id,
+        activity_id=instance.pk,
+        change_seq=CPDSyncState.next_seq(instance.engineer_id)
+    )
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_snapshots(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not SNAPSHOT_PROFILE_FIELDS.intersection(update_fields):
+        return
+    sync_snapshot_profile_fields(instance)
@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+
+from django.db.models import Count, Max, Q, Sum
+
+from ProComply.cache import bump_engineer_generation
+from accounts.models import UserProfile
+from .models import CPDActivity, ComplianceSnapshot
+
+ANNUAL_PDU_REQUIREMENT = 50
+
+SNAPSHOT_UPDATE_FIELDS = [
+    'pdus_earned', 'pdus_required', 'pdus_remaining', 'activity_count',
+    'last_activity_date', 'license_expiry_date', 'engineering_specialization',
+]
+
+_refresh_suppressed = ContextVar('snapshot_refresh_suppressed', default=False)
+
+
+@contextmanager
+def suppress_snapshot_refresh():
+    """Skip the signal-driven refresh for writes whose caller refreshes the snapshot itself"""
+    token = _refresh_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _refresh_suppressed.reset(token)
+
+
+def snapshot_refresh_suppressed():
+    return _refresh_suppressed.get()
+
+
+def year_range(year):
+    """Index-friendly date bounds for a calendar year"""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def _year_totals(queryset):
+    return queryset.aggregate(
+        earned=Sum('pdu_units_awarded', filter=Q(status='APPROVED')),
+        count=Count('id', filter=Q(status='APPROVED')),
+        last_activity=Max('date_completed'),
+    )
+
+
+def refresh_snapshot(engineer_id, year):
+    """Recompute one (engineer, year) snapshot from that engineer's activities"""
+    start, end = year_range(year)
+    totals = _year_totals(CPDActivity.objects.filter(
+        engineer_id=engineer_id,
+        date_completed__gte=start,
+        date_completed__lt=end
+    ))
+    profile = UserProfile.objects.filter(engineer_id=engineer_id).values(
+        'license_expiry_date', 'engineering_specialization'
+    ).first() or {}
+
+    earned = totals['earned'] or 0
+    snapshot, created = ComplianceSnapshot.objects.update_or_create(
+        engineer_id=engineer_id,
+        year=year,
+        defaults={
+            'pdus_earned': earned,
+            'pdus_required': ANNUAL_PDU_REQUIREMENT,
+            'pdus_remaining': max(0, ANNUAL_PDU_REQUIREMENT - earned),
+            'activity_count': totals['count'],
+            'last_activity_date': totals['last_activity'],
+            'license_expiry_date': profile.get('license_expiry_date'),
+            'engineering_specialization': profile.get('engineering_specialization'),
+        }
+    )
+
+    # UserProfile.pdu_units_earned mirrors the current year
+    if year == date.today().year:
+        UserProfile.objects.filter(engineer_id=engineer_id).exclude(
+            pdu_units_earned=earned
+        ).update(pdu_units_earned=earned)
+
+    # The engineer's activities changed, so drop their cached summaries, lists and reports
+    bump_engineer_generation(engineer_id)
+
+    return snapshot
+
+
+def sync_snapshot_profile_fields(profile):
+    """Copy license and specialization changes onto the engineer's snapshots"""
+    updated = ComplianceSnapshot.objects.filter(engineer_id=profile.engineer_id).update(
+        license_expiry_date=profile.license_expiry_date,
+        engineering_specialization=profile.engineering_specialization,
+    )
+    if not updated:
+        refresh_snapshot(profile.engineer_id, date.today().year)
+
+
+def rebuild_snapshots(year, batch_size=2000):
+    """
+    Rebuild every engineer's snapshot for a year with one grouped aggregate.
+    Engineers without activities get a zero row so they show as non-compliant.
+    """
+    start, end = year_range(year)
+    totals = {
+        row['engineer_id']: row for row in
+        CPDActivity.objects.filter(date_completed__gte=start, date_completed__lt=end)
+        .values('engineer_id')
+        .annotate(
+            earned=Sum('pdu_units_awarded', filter=Q(status='APPROVED')),
+            count=Count('id', filter=Q(status='APPROVED')),
+            last_activity=Max('date_completed'),
+        )
+        .order_by()
+    }
+
+    profiles = UserProfile.objects.values_list(
+        'engineer_id', 'license_expiry_date', 'engineering_specialization'
+    ).order_by('engineer_id')
+
+    batch = []
+    written = 0
+    for engineer_id, license_expiry_date, specialization in profiles.iterator(chunk_size=batch_size):
+        row = totals.get(engineer_id, {})
+        earned = row.get('earned') or 0
+        batch.append(ComplianceSnapshot(
+            engineer_id=engineer_id,
+            year=year,
+            pdus_earned=earned,
+            pdus_required=ANNUAL_PDU_REQUIREMENT,
+            pdus_remaining=max(0, ANNUAL_PDU_REQUIREMENT - earned),
+            activity_count=row.get('count') or 0,
+            last_activity_date=row.get('last_activity'),
+            license_expiry_date=license_expiry_date,
+            engineering_specialization=specialization,
+        ))
+        if len(batch) >= batch_size:
+            written += _upsert(batch)
+            batch = []
+
+    if batch:
+        written += _upsert(batch)
+    return written
+
+
+def _upsert(snapshots):
+    ComplianceSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['engineer', 'year'],
+        update_fields=SNAPSHOT_UPDATE_FIELDS + ['updated_at'],
+    )
+    return len(snapshots)
@@ -0,0 +1,48 @@
+from .models import CPDActivity, CPDActivityTombstone, CPDSyncState
+from .serializers import activity_rows
+
+DEFAULT_CHANGES_LIMIT = 200
+MAX_CHANGES_LIMIT = 1000
+
+
+def changes_since(engineer, cursor=None, limit=DEFAULT_CHANGES_LIMIT):
+    """
+    Activities written and deleted since ``cursor`` (a change sequence
+    number), oldest first. Without a cursor every live activity is
+    returned. A page never splits a sequence number, so a bulk write that
+    shares one is delivered whole.
+    """
+    activities = CPDActivity.objects.filter(engineer=engineer)
+    tombstones = CPDActivityTombstone.objects.filter(engineer=engineer)
+    if cursor is None:
+        # Read before the rows: a write racing this sync is sent again, never lost
+        full_sync_cursor = CPDSyncState.objects.filter(engineer=engineer).values_list(
+            'last_seq', flat=True
+        ).first() or 0
+        # Nothing was synced yet, so there is nothing to delete
+        tombstones = tombstones.none()
+    else:
+        activities = activities.filter(change_seq__gt=cursor)
+        tombstones = tombstones.filter(change_seq__gt=cursor)
+
+    seqs = sorted([
+        *activities.order_by('change_seq').values_list('change_seq', flat=True)[:limit + 1],
+        *tombstones.order_by('change_seq').values_list('change_seq', flat=True)[:limit + 1],
+    ])
+    has_more = len(seqs) > limit
+    if has_more:
+        # Up to and including the limit-th change
+        next_cursor = seqs[limit - 1]
+        activities = activities.filter(change_seq__lte=next_cursor)
+        tombstones = tombstones.filter(change_seq__lte=next_cursor)
+    elif cursor is None:
+        next_cursor = full_sync_cursor
+    else:
+        next_cursor = seqs[-1] if seqs else cursor
+
+    return {
+        'cursor': next_cursor,
+        'has_more': has_more,
+        'changed': activity_rows(activities.order_by('change_seq', 'id')),
+        'deleted': list(tombstones.order_by('change_seq').values_list('activity_id', flat=True)),
+    }
@@ -1,3 +1,622 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ProComply.cache import get_engineer_generation
+from ProComply.testing import APITestCase
+from accounts.models import Engineer, IdempotencyKey
+from .models import CPDActivity, CPDActivityTombstone, CPDSyncState, ComplianceSnapshot
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.engineer = Engineer.objects.create_user('sparse@example.com', firebase_uid='sparse-uid', first_name='Sparse', last_name='Engineer')
+        self.activity = CPDActivity.objects.create(
+            engineer=self.engineer,
+            title='Site visit',
+            description='A long description that sparse reads should not load',
+            activity_type='INFORMAL',
+            date_completed=date(2024, 3, 1),
+            hours_spent=4,
+        )
+        self.client = self.client_for(self.engineer)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_list_fields_limit_columns(self):
+        response, sql = self.get('/api/compliance/cpd-activities/?fields=id,title')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'id': self.activity.pk, 'title': 'Site visit'}])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_list_exclude(self):
+        response, sql = self.get('/api/compliance/cpd-activities/?exclude=description,supporting_document')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('description', response.json()[0])
+        self.assertIn('engineer_name', response.json()[0])
+        self.assertNotIn('"description"', sql)
+
+    def test_detail_fields_defer_columns_and_join(self):
+        response, sql = self.get(f'/api/compliance/cpd-activities/{self.activity.pk}/?fields=title,date_completed')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'title': 'Site visit', 'date_completed': '2024-03-01'})
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_detail_embedded_engineer_fields(self):
+        response, sql = self.get(f'/api/compliance/cpd-activities/{self.activity.pk}/?fields=id,engineer_name')
+
+        self.assertEqual(response.json(), {'id': self.activity.pk, 'engineer_name': 'Sparse Engineer'})
+        self.assertIn('JOIN', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/compliance/cpd-activities/?fields=id,secret')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', str(response.json()))
+
+
+class ChangesFeedTests(APITestCase):
+    def setUp(self):
+        self.engineer = Engineer.objects.create_user('sync@example.com', firebase_uid='sync-uid', first_name='Sync', last_name='Engineer')
+        self.activities = [
+            CPDActivity.objects.create(
+                engineer=self.engineer,
+                title=f'Activity {day}',
+                description='Synced',
+                activity_type='INFORMAL',
+                date_completed=date(2024, 1, day),
+                hours_spent=1,
+            )
+            for day in (1, 2, 3)
+        ]
+        self.client = self.client_for(self.engineer)
+
+    def changes(self, query=''):
+        response = self.client.get(f'/api/compliance/cpd-activities/changes/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_through_full_sync(self):
+        first = self.changes('?limit=2')
+        rest = self.changes(f"?limit=2&cursor={first['cursor']}")
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(rest['has_more'])
+        titles = [row['title'] for row in first['changed'] + rest['changed']]
+        self.assertEqual(titles, ['Activity 1', 'Activity 2', 'Activity 3'])
+
+    def test_returns_only_changes_and_tombstones_since_cursor(self):
+        cursor = self.changes()['cursor']
+        edited, deleted = self.activities[0], self.activities[1]
+        deleted_id = deleted.pk
+        edited.title = 'Edited'
+        edited.save()
+        deleted.delete()
+
+        changes = self.changes(f'?cursor={cursor}')
+
+        self.assertEqual([row['title'] for row in changes['changed']], ['Edited'])
+        self.assertEqual(changes['deleted'], [deleted_id])
+        self.assertEqual(self.changes(f"?cursor={changes['cursor']}")['changed'], [])
+
+
+class ReflowTests(APITestCase):
+    def setUp(self):
+        self.engineer = Engineer.objects.create_user('reflow@example.com', firebase_uid='reflow-uid', first_name='Re', last_name='Flow')
+        # PARTICIPATION is capped at 5 PDUs a year
+        self.first, self.second, self.third = [
+            CPDActivity.objects.create(
+                engineer=self.engineer,
+                title=f'Committee {day}',
+                description='Mentoring',
+                activity_type='PARTICIPATION',
+                date_completed=date(2024, 2, day),
+                hours_spent=3,
+            )
+            for day in (1, 2, 3)
+        ]
+        self.client = self.client_for(self.engineer)
+
+    def decisions(self):
+        return list(
+            CPDActivity.objects.filter(engineer=self.engineer).order_by('date_completed').values_list(
+                'status', 'pdu_units_awarded'
+            )
+        )
+
+    def test_edit_reflows_later_activities(self):
+        self.assertEqual(self.decisions(), [('APPROVED', 3), ('APPROVED', 2), ('REJECTED', 0)])
+
+        response = self.client.patch(f'/api/compliance/cpd-activities/{self.first.pk}/', {'hours_spent': 1}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['pdu_units_awarded'], 1)
+        self.assertEqual(self.decisions(), [('APPROVED', 1), ('APPROVED', 3), ('APPROVED', 1)])
+
+    def test_backdated_create_reflows_later_activities(self):
+        response = self.client.post('/api/compliance/cpd-activities/', {
+            'title': 'Committee 0',
+            'description': 'Mentoring',
+            'activity_type': 'PARTICIPATION',
+            'date_completed': '2024-01-15',
+            'hours_spent': 3,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['status'], response.json()['pdu_units_awarded']), ('APPROVED', 3))
+        self.assertEqual(self.decisions(), [('APPROVED', 3), ('APPROVED', 2), ('REJECTED', 0), ('REJECTED', 0)])
+        self.assertEqual(ComplianceSnapshot.objects.get(engineer=self.engineer, year=2024).pdus_earned, 5)
+
+        self.client.patch(f"/api/compliance/cpd-activities/{response.json()['id']}/", {'hours_spent': 1}, format='json')
+
+        self.assertEqual(self.decisions(), [('APPROVED', 1), ('APPROVED', 3), ('APPROVED', 1), ('REJECTED', 0)])
+
+    def test_edit_refreshes_snapshot_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(f'/api/compliance/cpd-activities/{self.first.pk}/', {'hours_spent': 1}, format='json')
+        snapshot_writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('UPDATE', 'INSERT')) and ComplianceSnapshot._meta.db_table in query['sql']
+        ]
+
+        self.assertEqual(len(snapshot_writes), 1)
+        self.assertEqual(ComplianceSnapshot.objects.get(engineer=self.engineer, year=2024).pdus_earned, 5)
+
+    def test_staff_approval_survives_reflow(self):
+        staff = Engineer.objects.create_user('admin@example.com', is_staff=True, is_superuser=True)
+        admin_client = Client()
+        admin_client.force_login(staff)
+        response = admin_client.post('/admin/compliance/cpdactivity/', {
+            'action': 'approve_activities', '_selected_action': [self.third.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.decisions(), [('APPROVED', 3), ('APPROVED', 2), ('APPROVED', 3)])
+
+        self.client.patch(f'/api/compliance/cpd-activities/{self.first.pk}/', {'hours_spent': 1}, format='json')
+
+        self.assertEqual(self.decisions(), [('APPROVED', 1), ('APPROVED', 3), ('APPROVED', 3)])
+
+    def test_delete_reflows_and_skips_unchanged_rows(self):
+        seq_before = CPDActivity.objects.get(pk=self.first.pk).change_seq
+
+        response = self.client.delete(f'/api/compliance/cpd-activities/{self.second.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.decisions(), [('APPROVED', 3), ('APPROVED', 2)])
+        self.assertEqual(CPDActivity.objects.get(pk=self.first.pk).change_seq, seq_before)
+
+
+class SimulationTests(APITestCase):
+    def setUp(self):
+        self.engineer = Engineer.objects.create_user('whatif@example.com', firebase_uid='whatif-uid', first_name='What', last_name='If')
+        CPDActivity.objects.create(
+            engineer=self.engineer,
+            title='Committee',
+            description='Mentoring',
+            activity_type='PARTICIPATION',
+            date_completed=date(2024, 1, 10),
+            hours_spent=3,
+        )
+        self.client = self.client_for(self.engineer)
+
+    def test_simulates_against_current_totals_without_writing(self):
+        planned = [
+            {'activity_type': 'PARTICIPATION', 'hours_spent': 4, 'date_completed': '2024-06-01'},
+            {'activity_type': 'PARTICIPATION', 'hours_spent': 1, 'date_completed': '2024-07-01'},
+        ]
+        with self.assertMaxQueries(2):
+            response = self.client.post('/api/compliance/cpd-activities/simulate/', planned, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([(r['status'], r['pdu_units_awarded']) for r in results], [('APPROVED', 2), ('REJECTED', 0)])
+        self.assertEqual(response.json()['years']['2024'], {'pdus_earned': 3, 'pdus_earned_after': 5})
+        self.assertEqual(CPDActivity.objects.count(), 1)
+
+
+class CacheInvalidationTests(APITestCase):
+    def test_generation_is_bumped_after_commit(self):
+        engineer = Engineer.objects.create_user('cache@example.com', firebase_uid='cache-uid')
+        generation = get_engineer_generation(engineer.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CPDActivity.objects.create(
+                engineer=engineer,
+                title='Seminar',
+                description='Codes of practice',
+                activity_type='INFORMAL',
+                date_completed=date(2024, 5, 1),
+                hours_spent=2,
+            )
+            self.assertEqual(get_engineer_generation(engineer.pk), generation)
+
+        self.assertNotEqual(get_engineer_generation(engineer.pk), generation)
+
+    @override_settings(ENGINEER_CACHE_ENABLED=False)
+    def test_disabled_without_a_shared_cache(self):
+        engineer = Engineer.objects.create_user('uncached@example.com', firebase_uid='uncached-uid')
+        activity = CPDActivity.objects.create(
+            engineer=engineer,
+            title='Seminar',
+            description='Codes of practice',
+            activity_type='INFORMAL',
+            date_completed=date(2024, 5, 1),
+            hours_spent=2,
+        )
+        client = self.client_for(engineer)
+
+        first = client.get('/api/compliance/cpd-activities/')
+        # A write whose generation bump this worker would never see
+        CPDActivity.objects.filter(pk=activity.pk).update(title='Renamed')
+        second = client.get('/api/compliance/cpd-activities/')
+
+        self.assertNotIn('ETag', first)
+        self.assertEqual(second.json()[0]['title'], 'Renamed')
+
+
+class EngineerDeletionTests(APITestCase):
+    def test_bulk_delete_leaves_no_snapshots_or_tombstones(self):
+        engineer = Engineer.objects.create_user('leaving@example.com')
+        CPDActivity.objects.create(
+            engineer=engineer,
+            title='Seminar',
+            description='Codes of practice',
+            activity_type='INFORMAL',
+            date_completed=date(2024, 5, 1),
+            hours_spent=2,
+        )
+
+        Engineer.objects.filter(pk=engineer.pk).delete()
+
+        self.assertFalse(ComplianceSnapshot.objects.filter(engineer_id=engineer.pk).exists())
+        self.assertFalse(CPDActivityTombstone.objects.filter(engineer_id=engineer.pk).exists())
+        self.assertFalse(CPDSyncState.objects.filter(engineer_id=engineer.pk).exists())
+
+
+class SearchTests(APITestCase):
+    """Runs against the fully migrated schema, so it also covers the index triggers"""
+
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user('search@example.com', firebase_uid='search-uid')
+        self.client = self.client_for(self.engineer)
+
+    def create(self, title, description):
+        return CPDActivity.objects.create(
+            engineer=self.engineer,
+            title=title,
+            description=description,
+            activity_type='INFORMAL',
+            date_completed=date(2024, 4, 1),
+            hours_spent=1,
+        )
+
+    def search(self, text):
+        response = self.client.get('/api/compliance/cpd-activities/search/', {'q': text})
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_finds_words_in_title_and_description(self):
+        activity = self.create('Bridge seminar', 'Load testing of steel decks')
+
+        self.assertEqual(self.search('bridge'), [activity.pk])
+        self.assertEqual(self.search('steel'), [activity.pk])
+        self.assertEqual(self.search('tunnel'), [])
+
+    def test_title_matches_rank_first(self):
+        in_description = self.create('Site visit', 'Inspected the bridge bearings')
+        in_title = self.create('Bridge inspection', 'Inspected the deck bearings')
+
+        self.assertEqual(self.search('bridge'), [in_title.pk, in_description.pk])
+
+    def test_edited_title_is_reindexed(self):
+        activity = self.create('Bridge seminar', 'Codes of practice')
+
+        response = self.client.patch(f'/api/compliance/cpd-activities/{activity.pk}/', {'title': 'Tunnel seminar'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search('tunnel'), [activity.pk])
+        self.assertEqual(self.search('bridge'), [])
+
+    def test_deleted_activity_is_not_returned(self):
+        activity = self.create('Bridge seminar', 'Codes of practice')
+
+        self.client.delete(f'/api/compliance/cpd-activities/{activity.pk}/')
+
+        self.assertEqual(self.search('bridge'), [])
+
+
+class IdempotentCreateTests(APITestCase):
+    payload = {
+        'title': 'Bridge seminar',
+        'description': 'Codes of practice',
+        'activity_type': 'INFORMAL',
+        'date_completed': '2024-04-01',
+        'hours_spent': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user('create@example.com', firebase_uid='create-uid')
+        self.client = self.client_for(self.engineer)
+
+    def create(self):
+        return self.client.post('/api/compliance/cpd-activities/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='create-key')
+
+    def test_retry_creates_one_activity(self):
+        first = self.create()
+        retry = self.create()
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(CPDActivity.objects.filter(engineer=self.engineer).count(), 1)
+
+    def test_exception_releases_the_key(self):
+        with mock.patch('compliance.views.CPDActivityListCreateView.perform_create', side_effect=RuntimeError('down')):
+            with self.assertRaises(RuntimeError):
+                self.create()
+
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.create().status_code, 201)
+
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user('etag@example.com', firebase_uid='etag-uid')
+        self.client = self.client_for(self.engineer)
+
+    def test_activities_list_is_revalidated(self):
+        response = self.client.get('/api/compliance/cpd-activities/')
+
+        response = self.client.get('/api/compliance/cpd-activities/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_dashboard_etag_changes_with_the_date(self):
+        response = self.client.get('/api/compliance/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+        etag = response['ETag']
+
+        response = self.client.get('/api/compliance/dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with mock.patch('ProComply.conditional.date') as mock_date:
+            mock_date.today.return_value = date.today() + timedelta(days=2)
+            response = self.client.get('/api/compliance/dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class QueryParamValidationTests(APITestCase):
+    """Malformed query params are answered with a 400, never a 500"""
+
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user('params@example.com', firebase_uid='params-uid')
+        self.staff = Engineer.objects.create_user('staff@example.com', firebase_uid='staff-uid', is_staff=True)
+        self.client = self.client_for(self.engineer)
+
+    def assertBadRequest(self, client, paths):
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(client.get(path).status_code, 400)
+
+    def test_dashboard_params(self):
+        self.assertBadRequest(self.client, [
+            '/api/compliance/dashboard/?year=0',
+            '/api/compliance/dashboard/?year=10000',
+            '/api/compliance/dashboard/?year=abc',
+        ])
+        response = self.client.get('/api/compliance/dashboard/?recent=-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recent_activities'], [])
+
+    def test_summary_years(self):
+        self.assertBadRequest(self.client, [
+            '/api/compliance/cpd-summary/?year=0',
+            '/api/compliance/cpd-summary/?year=10000',
+            '/api/compliance/cpd-summary/range/?end_year=9999',
+            '/api/compliance/cpd-summary/range/?end_year=5&window=10',
+            '/api/compliance/async/cpd-summary/?year=abc',
+        ])
+
+    def test_summary_year_is_normalized(self):
+        for path in ['/api/compliance/cpd-summary/', '/api/compliance/async/cpd-summary/']:
+            with self.subTest(path=path):
+                padded = self.client.get(path, {'year': '02024'}).json()
+                plain = self.client.get(path, {'year': '2024'}).json()
+
+                self.assertEqual(padded['year'], 2024)
+                self.assertEqual(padded, plain)
+
+    def test_report_year(self):
+        self.assertBadRequest(self.client, [
+            '/api/compliance/cpd-report/?year=abc',
+            '/api/compliance/cpd-report/?year=10000',
+        ])
+
+    def test_simulation_year(self):
+        planned = {'activity_type': 'INFORMAL', 'hours_spent': 2, 'date_completed': '9999-06-01'}
+        response = self.client.post('/api/compliance/cpd-activities/simulate/', planned, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_year(self):
+        self.assertBadRequest(self.client_for(self.staff), ['/api/compliance/staff/compliance-snapshots/?year=abc'])
+
+    def test_export_dates(self):
+        self.assertBadRequest(self.client_for(self.staff), [
+            '/api/compliance/staff/cpd-activities/export/?date_from=2024-13-01',
+            '/api/compliance/staff/cpd-activities/export/?date_to=abc',
+        ])
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Maximum queries per endpoint with several activities on record, so an
+    N+1 (or a lost select_related) fails here. Budgets include the Firebase
+    token user lookup and are measured with cold caches.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.engineer = Engineer.objects.create_user(
+            'budget@example.com', firebase_uid='budget-uid', first_name='Budget', last_name='Engineer'
+        )
+        self.staff = Engineer.objects.create_user(
+            'staff@example.com', firebase_uid='staff-uid', first_name='Staff', last_name='Member', is_staff=True
+        )
+        self.year = date.today().year
+        self.activities = [
+            CPDActivity.objects.create(
+                engineer=self.engineer,
+                title=f'Seminar {index}',
+                description='Structural design seminar',
+                activity_type=activity_type,
+                date_completed=date(self.year, 1, index + 1),
+                hours_spent=2,
+            )
+            for index, activity_type in enumerate(['EBK_ORGANIZED', 'PARTICIPATION', 'PRESENTATION', 'INFORMAL', 'INFORMAL'])
+        ]
+        self.client = self.client_for(self.engineer)
+
+    def get(self, client, path, budget, status=200):
+        with self.assertMaxQueries(budget):
+            response = client.get(path)
+            # Streaming responses run their queries while being consumed
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status, getattr(response, 'content', b'')[:500])
+        return response
+
+    def test_activity_list(self):
+        self.get(self.client, '/api/compliance/cpd-activities/', 3)
+
+    def test_activity_list_sparse(self):
+        self.get(self.client, '/api/compliance/cpd-activities/?fields=id,title', 3)
+
+    def test_activity_create(self):
+        payload = {
+            'title': 'Site visit',
+            'description': 'Bridge inspection',
+            'activity_type': 'WORK_BASED',
+            'date_completed': date(self.year, 1, 20).isoformat(),
+            'hours_spent': 150,
+        }
+        with self.assertMaxQueries(22):
+            response = self.client.post('/api/compliance/cpd-activities/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_activity_detail(self):
+        self.get(self.client, f'/api/compliance/cpd-activities/{self.activities[0].pk}/', 2)
+
+    def test_activity_update(self):
+        with self.assertMaxQueries(24):
+            response = self.client.patch(
+                f'/api/compliance/cpd-activities/{self.activities[0].pk}/', {'hours_spent': 1}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_activity_delete(self):
+        with self.assertMaxQueries(21):
+            response = self.client.delete(f'/api/compliance/cpd-activities/{self.activities[0].pk}/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_activity_search(self):
+        # Authentication, count, ranked ids, rows
+        self.get(self.client, '/api/compliance/cpd-activities/search/?q=seminar', 4)
+
+    def test_activity_changes(self):
+        self.get(self.client, '/api/compliance/cpd-activities/changes/?cursor=1', 5)
+
+    def test_activity_simulate(self):
+        planned = [{'activity_type': 'INFORMAL', 'hours_spent': 3}, {'activity_type': 'WORK_BASED', 'hours_spent': 300}]
+        with self.assertMaxQueries(2):
+            response = self.client.post('/api/compliance/cpd-activities/simulate/', planned, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_summary(self):
+        self.get(self.client, f'/api/compliance/cpd-summary/?year={self.year}', 2)
+
+    def test_summary_range(self):
+        self.get(self.client, '/api/compliance/cpd-summary/range/?window=5', 2)
+
+    def test_report(self):
+        self.get(self.client, f'/api/compliance/cpd-report/?year={self.year}', 6)
+
+    def test_dashboard(self):
+        self.get(self.client, '/api/compliance/dashboard/', 4)
+
+    def test_staff_compliance_snapshots(self):
+        self.get(self.client_for(self.staff), f'/api/compliance/staff/compliance-snapshots/?year={self.year}', 3)
+
+    def test_staff_export(self):
+        self.get(self.client_for(self.staff), '/api/compliance/staff/cpd-activities/export/?output=ndjson', 2)
+
+    def test_async_activity_list(self):
+        self.get(self.client, '/api/compliance/async/cpd-activities/', 2)
+
+    def test_async_summary(self):
+        self.get(self.client, f'/api/compliance/async/cpd-summary/?year={self.year}', 2)
+
+    def test_cached_reads_only_authenticate(self):
+        self.get(self.client, '/api/compliance/cpd-activities/', 3)
+        self.get(self.client, '/api/compliance/cpd-activities/', 1)
+
+
+class SyntheticDataTests(APITestCase):
+    def generate(self, *args):
+        call_command(
+            'generate-synthetic-data', '--engineers', '3', '--years', '2', '--skip-snapshots', *args, stdout=StringIO()
+        )
+
+    def generated(self):
+        engineers = Engineer.objects.filter(email__startswith='synthetic-').order_by('email')
+        return [
+            (
+                engineer.email,
+                engineer.profile.engineering_specialization,
+                engineer.profile.license_expiry_date,
+                list(engineer.cpd_activities.order_by('date_completed', 'title').values_list(
+                    'title', 'activity_type', 'date_completed', 'hours_spent', 'status', 'pdu_units_awarded'
+                )),
+            )
+            for engineer in engineers
+        ]
+
+    def test_same_seed_generates_the_same_data(self):
+        self.generate('--seed', '7')
+        first = self.generated()
+        Engineer.objects.filter(email__startswith='synthetic-').delete()
+
+        self.generate('--seed', '7')
+
+        self.assertEqual(len(first), 3)
+        self.assertTrue(any(activities for *_, activities in first))
+        self.assertEqual(self.generated(), first)
+
+    def test_refuses_existing_indices(self):
+        self.generate('--seed', '7')
+
+        with self.assertRaises(CommandError):
+            self.generate('--seed', '7', '--offset', '2')
+        self.generate('--seed', '7', '--offset', '3')
+        self.generate('--seed', '8')
+
+        self.assertEqual(Engineer.objects.filter(email__startswith='synthetic-7-').count(), 6)
+        self.assertEqual(Engineer.objects.filter(email__startswith='synthetic-8-').count(), 3)
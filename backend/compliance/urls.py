@@ -2,13 +2,32 @@ from django.urls import path
 from .views import (
     CPDActivityListCreateView, 
     CPDActivityDetailView, 
+    CPDActivitySearchView,
+    CPDActivityChangesView,
+    CPDSimulationView,
     CPDSummaryView,
+    CPDSummaryRangeView,
+    DashboardView,
+    ComplianceSnapshotListView,
+    export_cpd_activities,
     generate_cpd_report
 )
+from .async_views import cpd_activity_list_async, cpd_summary_async
 
 urlpatterns = [ 
     path('cpd-activities/', CPDActivityListCreateView.as_view(), name='cpd-activity-list-create'),
+    path('cpd-activities/search/', CPDActivitySearchView.as_view(), name='cpd-activity-search'),
+    path('cpd-activities/changes/', CPDActivityChangesView.as_view(), name='cpd-activity-changes'),
+    path('cpd-activities/simulate/', CPDSimulationView.as_view(), name='cpd-activity-simulate'),
     path('cpd-activities/<int:pk>/', CPDActivityDetailView.as_view(), name='cpd-activity-detail'),
     path('cpd-summary/', CPDSummaryView.as_view(), name='cpd-summary'),
+    path('cpd-summary/range/', CPDSummaryRangeView.as_view(), name='cpd-summary-range'),
     path('cpd-report/', generate_cpd_report, name='cpd-report'),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('staff/compliance-snapshots/', ComplianceSnapshotListView.as_view(), name='compliance-snapshot-list'),
+    path('staff/cpd-activities/export/', export_cpd_activities, name='cpd-activity-export'),
+
+    # Async-native read paths for ASGI deployments
+    path('async/cpd-activities/', cpd_activity_list_async, name='cpd-activity-list-async'),
+    path('async/cpd-summary/', cpd_summary_async, name='cpd-summary-async'),
 ]
\ No newline at end of file
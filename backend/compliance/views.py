@@ -1,12 +1,29 @@
 from django.shortcuts import render
-from django.http import HttpResponse
-from rest_framework import generics, permissions
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import generics, permissions, serializers
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Sum
-from .models import CPDActivity
-from .serializers import CPDActivitySerializer
-from datetime import date
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from ProComply.throttling import ExportThrottle, ReportThrottle, limit_concurrency
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractYear
+from .models import CPDActivity, ComplianceSnapshot
+from accounts.models import UserProfile
+from accounts.serializers import UserProfileSerializer
+from .serializers import CPDActivitySerializer, CPDSimulationSerializer, ComplianceSnapshotSerializer, activity_rows
+from .exports import EXPORT_FORMATS, filter_export_queryset, stream_export
+from .search import ActivitySearch
+from .sync import DEFAULT_CHANGES_LIMIT, MAX_CHANGES_LIMIT, changes_since
+from .reflow import reflow_after_change
+from .snapshots import suppress_snapshot_refresh
+from . import rules
+from accounts.idempotency import idempotent
+from ProComply.cache import cached_for_engineer
+from ProComply.conditional import conditional_on_engineer
+from ProComply.routers import replica_safe
+from ProComply.serializers import apply_sparse_fieldset
+from datetime import date, timedelta
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
@@ -20,90 +37,474 @@ class CPDActivityListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return CPDActivity.objects.filter(engineer=self.request.user)
+        return CPDActivity.objects.filter(engineer=self.request.user).select_related('engineer')
+
+    @conditional_on_engineer('activities')
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        fields = list(serializer.fields) if serializer.is_sparse else None
+        data = cached_for_engineer(
+            request.user.pk, 'activities', lambda: activity_rows(self.get_queryset(), fields), *(fields or [])
+        )
+        return Response(data)
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(engineer=self.request.user)
+        with transaction.atomic():
+            with suppress_snapshot_refresh():
+                activity = serializer.save(engineer=self.request.user)
+            # A backdated activity counts against the caps of later ones that year
+            reflow_after_change(activity.engineer_id, activity.date_completed)
 
 
-class CPDActivityDetailView(generics.RetrieveAPIView):
+class CPDActivityDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Edits and deletes re-run the annual caps for the rest of that year,
+    since they change the totals later activities were decided against.
+    """
     queryset = CPDActivity.objects.all()
     serializer_class = CPDActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return CPDActivity.objects.filter(engineer=self.request.user)
+        queryset = CPDActivity.objects.filter(engineer=self.request.user).select_related('engineer')
+        return apply_sparse_fieldset(queryset, self.get_serializer())
+
+    def perform_update(self, serializer):
+        old_date = serializer.instance.date_completed
+        with transaction.atomic():
+            # The reflow refreshes the affected years' snapshots once
+            # An engineer's edit returns the activity to the automatic rules
+            with suppress_snapshot_refresh():
+                activity = serializer.save(staff_decision=False)
+            reflow_after_change(activity.engineer_id, old_date, activity.date_completed)
+            # Pick up the decision the reflow made for the edited row
+            activity.refresh_from_db(fields=['status', 'pdu_units_awarded', 'rejection_reason'])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            with suppress_snapshot_refresh():
+                instance.delete()
+            reflow_after_change(instance.engineer_id, instance.date_completed)
+
+
+class CPDActivityChangesView(generics.GenericAPIView):
+    """
+    Delta sync feed: activities changed and deleted since ?cursor=N.
+    Omit the cursor for the first sync, then pass back the returned one
+    (repeating while has_more is true).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            cursor = request.query_params.get('cursor')
+            cursor = int(cursor) if cursor not in (None, '') else None
+            limit = min(int(request.query_params.get('limit', DEFAULT_CHANGES_LIMIT)), MAX_CHANGES_LIMIT)
+        except ValueError:
+            return Response({'error': 'cursor and limit must be integers'}, status=400)
+        if (cursor is not None and cursor < 0) or limit < 1:
+            return Response({'error': 'cursor must not be negative and limit must be positive'}, status=400)
+
+        return Response(changes_since(request.user, cursor, limit))
+
+
+MAX_SIMULATED_ACTIVITIES = 50
+
+
+@replica_safe
+class CPDSimulationView(generics.GenericAPIView):
+    """
+    What-if: the PDUs planned activities would be awarded on top of what
+    the engineer already has, evaluated in the order given. Read-only.
+    """
+    serializer_class = CPDSimulationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        many = isinstance(request.data, list)
+        if many and not 0 < len(request.data) <= MAX_SIMULATED_ACTIVITIES:
+            return Response({'error': f'Send 1 to {MAX_SIMULATED_ACTIVITIES} activities'}, status=400)
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+        planned = serializer.validated_data if many else [serializer.validated_data]
+
+        today = date.today()
+        years = [activity.get('date_completed', today).year for activity in planned]
+        start_year, end_year = min(years), max(years)
+        if end_year > MAX_YEAR:
+            return Response({'error': f'date_completed must be before {MAX_YEAR + 1}'}, status=400)
+        if end_year - start_year + 1 > MAX_SUMMARY_YEARS:
+            return Response({'error': f'Activities must fall within {MAX_SUMMARY_YEARS} years'}, status=400)
+
+        breakdowns = cached_for_engineer(
+            request.user.pk, 'approved-totals',
+            lambda: category_breakdowns(request.user, start_year, end_year),
+            start_year, end_year
+        )
+        totals = {year: dict(breakdowns[year]) for year in set(years)}
+
+        results = []
+        for activity, year in zip(planned, years):
+            status, pdus, reason = rules.evaluate(activity['activity_type'], activity['hours_spent'], totals[year])
+            rules.apply(totals[year], activity['activity_type'], status, pdus)
+            results.append({
+                'title': activity.get('title', ''),
+                'activity_type': activity['activity_type'],
+                'hours_spent': activity['hours_spent'],
+                'year': year,
+                'status': status,
+                'pdu_units_awarded': pdus,
+                'rejection_reason': reason,
+            })
+
+        return Response({
+            'results': results,
+            'years': {
+                year: {
+                    'pdus_earned': sum(breakdowns[year].values()),
+                    'pdus_earned_after': sum(totals[year].values()),
+                }
+                for year in sorted(totals)
+            },
+        })
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class CPDActivitySearchView(generics.ListAPIView):
+    """
+    Ranked keyword search over activity titles and descriptions.
+    Engineers search their own activities; staff may pass scope=all.
+    """
+    serializer_class = CPDActivitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            raise serializers.ValidationError({'q': 'A search term is required.'})
+
+        user = self.request.user
+        if user.is_staff and self.request.query_params.get('scope') == 'all':
+            return ActivitySearch(text)
+        return ActivitySearch(text, engineer_id=user.id)
 
 
 class CPDSummaryView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_engineer('summary', depends_on_today=True)
     def get(self, request):
-        year = request.query_params.get('year', date.today().year)
-        engineer = request.user
+        try:
+            year = parse_year(request.query_params.get('year', date.today().year))
+        except ValueError:
+            return Response({'error': f'year must be an integer from {MIN_YEAR} to {MAX_YEAR}'}, status=400)
 
-        # Total PDUs
-        total_pdus = CPDActivity.objects.filter(
-            engineer=engineer,
-            date_completed__year=year,
-            status='APPROVED'
-        ).aggregate(total=Sum('pdu_units_awarded'))['total'] or 0
-
-        # Breakdown by category
-        category_breakdown = {}
-        for code, label in CPDActivity.ACTIVITY_TYPE_CHOICES:
-            pdus = CPDActivity.objects.filter(
-                engineer=engineer,
-                activity_type=code,
-                date_completed__year=year,
-                status='APPROVED'
-            ).aggregate(total=Sum('pdu_units_awarded'))['total'] or 0
-            category_breakdown[code] = pdus
-
-        # Limits per category
-        MAX_PDUS_PER_CATEGORY = {
-            'EBK_ORGANIZED': 10,
-            'PARTICIPATION': 5,
-            'PRESENTATION': 10,
-            'KNOWLEDGE_CONTRIBUTION': 10,
-            'WORK_BASED': 10,
-            'INFORMAL': 10,
-            'ACCREDITED_PROVIDER': 25,
-        }
+        def build():
+            return build_summary(year, category_breakdowns(request.user, year, year)[year])
 
-        # Calculate remaining per category
-        remaining_by_category = {
-            cat: max(0, MAX_PDUS_PER_CATEGORY.get(cat, 10) - earned)
-            for cat, earned in category_breakdown.items()
-        }
+        return Response(cached_for_engineer(request.user.pk, 'summary', build, year))
+
+
+MAX_SUMMARY_YEARS = 20
+
+
+class CPDSummaryRangeView(generics.GenericAPIView):
+    """
+    Summaries for several years in one round trip.
 
-        # Overall progress
-        total_required = 50
-        total_remaining = max(0, total_required - total_pdus)
+    Either start_year/end_year (inclusive) or window=N for the N years
+    ending at end_year (default: current year).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on_engineer('summary-range', depends_on_today=True)
+    def get(self, request):
+        params = request.query_params
+        try:
+            end_year = parse_year(params.get('end_year', date.today().year))
+            if 'window' in params:
+                start_year = parse_year(end_year - int(params['window']) + 1)
+            else:
+                start_year = parse_year(params.get('start_year', end_year))
+        except ValueError:
+            return Response(
+                {'error': f'start_year, end_year and window must be integers, years from {MIN_YEAR} to {MAX_YEAR}'},
+                status=400
+            )
+
+        if start_year > end_year:
+            return Response({'error': 'start_year must not be after end_year'}, status=400)
+        if end_year - start_year + 1 > MAX_SUMMARY_YEARS:
+            return Response({'error': f'At most {MAX_SUMMARY_YEARS} years can be requested'}, status=400)
 
+        def build():
+            breakdowns = category_breakdowns(request.user, start_year, end_year)
+            return [build_summary(year, breakdowns[year]) for year in range(start_year, end_year + 1)]
+
+        summaries = cached_for_engineer(request.user.pk, 'summary-range', build, start_year, end_year)
+        total_earned = sum(summary['total_pdus_earned'] for summary in summaries)
+        total_required = sum(summary['total_pdus_required'] for summary in summaries)
         return Response({
-            'year': year,
-            'total_pdus_earned': total_pdus,
+            'start_year': start_year,
+            'end_year': end_year,
+            'total_pdus_earned': total_earned,
             'total_pdus_required': total_required,
-            'total_pdus_remaining': total_remaining,
-            'breakdown_by_category': {
-                cat: {
-                    'earned': category_breakdown[cat],
-                    'remaining': remaining_by_category[cat],
-                    'limit': MAX_PDUS_PER_CATEGORY.get(cat, 10)
-                }
-                for cat in category_breakdown
-            }
+            'total_pdus_remaining': max(0, total_required - total_earned),
+            'years': summaries,
         })
 
 
+DASHBOARD_MAX_RECENT = 20
+
+
+class DashboardView(generics.GenericAPIView):
+    """
+    Everything HomePage needs in one response: profile, the year's summary,
+    license status and the most recent activities (?recent=N, default 5).
+    Built from three queries and cached per engineer.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on_engineer('dashboard', depends_on_today=True)
+    def get(self, request):
+        try:
+            year = parse_year(request.query_params.get('year', date.today().year))
+            recent = int(request.query_params.get('recent', 5))
+        except ValueError:
+            return Response(
+                {'error': f'year must be an integer from {MIN_YEAR} to {MAX_YEAR}, recent an integer'},
+                status=400
+            )
+        recent = max(0, min(recent, DASHBOARD_MAX_RECENT))
+
+        # license_status depends on today's date, so the key does too
+        data = cached_for_engineer(
+            request.user.pk, 'dashboard',
+            lambda: self.build(request.user, year, recent),
+            year, recent, date.today().isoformat()
+        )
+        if data is None:
+            return Response({'error': 'Profile not found'}, status=404)
+        return Response(data)
+
+    def build(self, engineer, year, recent):
+        profile = UserProfile.objects.select_related('engineer').filter(engineer=engineer).first()
+        if profile is None:
+            return None
+
+        breakdown = {code: 0 for code, label in CPDActivity.ACTIVITY_TYPE_CHOICES}
+        activity_count = 0
+        totals = CPDActivity.objects.filter(
+            engineer=engineer,
+            date_completed__gte=date(year, 1, 1),
+            date_completed__lt=date(year + 1, 1, 1),
+        ).values('activity_type').annotate(
+            total=Sum('pdu_units_awarded', filter=Q(status='APPROVED')),
+            count=Count('id'),
+        ).order_by()
+        for row in totals:
+            breakdown[row['activity_type']] = row['total'] or 0
+            activity_count += row['count']
+
+        return {
+            'profile': UserProfileSerializer(profile).data,
+            'license_status': profile.license_status,
+            'summary': build_summary(year, breakdown),
+            'activity_count': activity_count,
+            'recent_activities': activity_rows(
+                CPDActivity.objects.filter(engineer=engineer).order_by('-date_completed', '-id')[:recent]
+            ),
+        }
+
+
+# Year ranges are bounded by date(year + 1, 1, 1), so 9999 itself cannot be queried
+MIN_YEAR = 1
+MAX_YEAR = 9998
+
+
+def parse_year(value):
+    """Year from a query param, raising ValueError outside MIN_YEAR..MAX_YEAR"""
+    year = int(value)
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise ValueError(f'year {year} is out of range')
+    return year
+
+
+def category_breakdowns(engineer, start_year, end_year):
+    """Approved PDUs per {year: {activity_type: total}} from one grouped query"""
+    breakdowns = {
+        year: {code: 0 for code, label in CPDActivity.ACTIVITY_TYPE_CHOICES}
+        for year in range(start_year, end_year + 1)
+    }
+    totals = CPDActivity.objects.filter(
+        engineer=engineer,
+        date_completed__gte=date(start_year, 1, 1),
+        date_completed__lt=date(end_year + 1, 1, 1),
+        status='APPROVED'
+    ).annotate(
+        year=ExtractYear('date_completed')
+    ).values('year', 'activity_type').annotate(
+        total=Sum('pdu_units_awarded')
+    ).order_by()
+
+    for row in totals:
+        breakdowns[row['year']][row['activity_type']] = row['total'] or 0
+    return breakdowns
+
+
+def build_summary(year, category_breakdown):
+    """Shape per-category earned PDUs into the cpd-summary response"""
+    total_pdus = sum(category_breakdown.values())
+    MAX_PDUS_PER_CATEGORY = CPDActivity.MAX_PDUS_PER_CATEGORY
+
+    # Calculate remaining per category
+    remaining_by_category = {
+        cat: max(0, MAX_PDUS_PER_CATEGORY.get(cat, 10) - earned)
+        for cat, earned in category_breakdown.items()
+    }
+
+    # Overall progress
+    total_required = 50
+    total_remaining = max(0, total_required - total_pdus)
+
+    return {
+        'year': year,
+        'total_pdus_earned': total_pdus,
+        'total_pdus_required': total_required,
+        'total_pdus_remaining': total_remaining,
+        'breakdown_by_category': {
+            cat: {
+                'earned': category_breakdown[cat],
+                'remaining': remaining_by_category[cat],
+                'limit': MAX_PDUS_PER_CATEGORY.get(cat, 10)
+            }
+            for cat in category_breakdown
+        }
+    }
+
+
+class SnapshotPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ComplianceSnapshotListView(generics.ListAPIView):
+    """
+    Staff view of board-wide compliance, served from ComplianceSnapshot.
+
+    Filters: year, status=non_compliant|compliant,
+    license=expired|expiring_soon|valid|none, specialization
+    """
+    serializer_class = ComplianceSnapshotSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = SnapshotPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        today = date.today()
+        try:
+            year = parse_year(params.get('year', today.year))
+        except ValueError:
+            raise serializers.ValidationError({'year': f'Must be an integer from {MIN_YEAR} to {MAX_YEAR}.'})
+
+        queryset = ComplianceSnapshot.objects.select_related('engineer').filter(year=year)
+
+        status_filter = params.get('status')
+        if status_filter == 'non_compliant':
+            queryset = queryset.filter(pdus_remaining__gt=0)
+        elif status_filter == 'compliant':
+            queryset = queryset.filter(pdus_remaining=0)
+
+        license_filter = params.get('license')
+        if license_filter == 'expired':
+            queryset = queryset.filter(license_expiry_date__lt=today)
+        elif license_filter == 'expiring_soon':
+            queryset = queryset.filter(
+                license_expiry_date__gte=today,
+                license_expiry_date__lte=today + timedelta(days=60)
+            )
+        elif license_filter == 'valid':
+            queryset = queryset.filter(license_expiry_date__gt=today + timedelta(days=60))
+        elif license_filter == 'none':
+            queryset = queryset.filter(license_expiry_date__isnull=True)
+
+        specialization = params.get('specialization')
+        if specialization:
+            queryset = queryset.filter(engineering_specialization=specialization)
+
+        return queryset
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+@throttle_classes([ExportThrottle])
+def export_cpd_activities(request):
+    """
+    Stream CPD activities as CSV or NDJSON for auditors.
+
+    Params: output=csv|ndjson, gzip=1, year, date_from, date_to,
+    engineer, status, activity_type
+    """
+    params = request.query_params
+    export_format = params.get('output', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': f"output must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    try:
+        queryset = filter_export_queryset(params)
+    except ValueError:
+        return Response(
+            {'error': 'year and engineer must be integers, date_from and date_to YYYY-MM-DD dates'},
+            status=400
+        )
+
+    gzip = params.get('gzip') in ('1', 'true')
+    content_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"cpd_activities_{date.today().isoformat()}.{extension}"
+    if gzip:
+        content_type = 'application/gzip'
+        filename += '.gz'
+
+    response = StreamingHttpResponse(stream_export(queryset, export_format, gzip=gzip), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([ReportThrottle])
+@limit_concurrency('report', 'REPORT_MAX_CONCURRENCY')
 def generate_cpd_report(request):
     """Generate PDF report of CPD activities"""
-    year = request.query_params.get('year', date.today().year)
+    try:
+        year = parse_year(request.query_params.get('year', date.today().year))
+    except ValueError:
+        return Response({'error': f'year must be an integer from {MIN_YEAR} to {MAX_YEAR}'}, status=400)
     engineer = request.user
-    
+
+    # Reports show the generation date, so they are cached per day
+    pdf = cached_for_engineer(
+        engineer.pk, 'report', lambda: render_cpd_report(engineer, year), year, date.today().isoformat()
+    )
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="CPD_Report_{year}_{engineer.last_name}.pdf"'
+    return response
+
+
+def render_cpd_report(engineer, year):
+    """Render the CPD report PDF for one engineer and year"""
     # Get activities
     activities = CPDActivity.objects.filter(
         engineer=engineer,
@@ -216,10 +617,4 @@ def generate_cpd_report(request):
     
     # Build PDF
     doc.build(elements)
-    buffer.seek(0)
-    
-    # Return PDF
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="CPD_Report_{year}_{engineer.last_name}.pdf"'
-    
-    return response
\ No newline at end of file
+    return buffer.getvalue()
\ No newline at end of file
@@ -6,6 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    # The test suite runs against the hermetic test settings unless told otherwise
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ProComply.settings_test')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ProComply.settings')
     try:
         from django.core.management import execute_from_command_line
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import RequestProfile
+from .profiling import format_profile_stats
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'engineer']
+    list_filter = ['method', 'status_code']
+    search_fields = ['path']
+    list_select_related = ['engineer']
+    readonly_fields = [
+        'engineer', 'method', 'path', 'query_string', 'status_code',
+        'duration_ms', 'query_count', 'profile_file', 'created_at', 'top_functions'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Top functions (cumulative)')
+    def top_functions(self, obj):
+        return format_html('<pre style="font-size: 11px;">{}</pre>', format_profile_stats(obj))
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+
+    def ready(self):
+        import ProComply.checks
+
+        if settings.SLOW_QUERY_CAPTURE_ENABLED:
+            from django.db.backends.signals import connection_created
+            from .slow_queries import install_recorder
+            connection_created.connect(install_recorder, dispatch_uid='monitoring.slow_queries')
@@ -0,0 +1,130 @@
+import contextlib
+import itertools
+import time
+from unittest import mock
+
+from firebase_admin import auth
+
+FAKE_TOKEN_PREFIX = 'fake-token:'
+
+
+def make_fake_token(engineer):
+    """Bearer token understood by FakeFirebaseAuth"""
+    return f"{FAKE_TOKEN_PREFIX}{engineer.firebase_uid}:{engineer.email}:{engineer.first_name} {engineer.last_name}"
+
+
+class FakeFirebaseAuth:
+    """
+    Local stand-in for firebase_admin.auth.verify_id_token.
+    The optional latency blocks the calling thread like the real network call.
+    """
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self._patcher = mock.patch('firebase_admin.auth.verify_id_token', self.verify_id_token)
+
+    def verify_id_token(self, id_token, *args, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if not id_token.startswith(FAKE_TOKEN_PREFIX):
+            raise auth.InvalidIdTokenError('Unknown fake token')
+
+        uid, email, name = id_token[len(FAKE_TOKEN_PREFIX):].split(':', 2)
+        return {'uid': uid, 'email': email, 'name': name}
+
+    def __enter__(self):
+        self._patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patcher.stop()
+
+
+class FakeCloudinary:
+    """
+    Local stand-in for cloudinary.uploader upload/destroy. Uploads return a
+    result shaped like the real API so CloudinaryField builds its resource.
+    """
+    def __init__(self, latency_ms=0, cloud_name='demo'):
+        self.latency = latency_ms / 1000
+        self.cloud_name = cloud_name
+        self.uploads = []
+        self.destroyed = []
+        self._ids = itertools.count(1)
+        self._patchers = [
+            mock.patch('cloudinary.uploader.upload', self.upload),
+            mock.patch('cloudinary.uploader.upload_large', self.upload),
+            mock.patch('cloudinary.uploader.destroy', self.destroy),
+        ]
+
+    def upload(self, file, **options):
+        if self.latency:
+            time.sleep(self.latency)
+        folder = options.get('folder', '').strip('/')
+        public_id = f"{folder}/fake-{next(self._ids)}" if folder else f"fake-{next(self._ids)}"
+        resource_type = options.get('resource_type') or 'image'
+        if resource_type == 'auto':
+            resource_type = 'image'
+        self.uploads.append(public_id)
+        url = f"https://res.cloudinary.com/{self.cloud_name}/{resource_type}/upload/v1/{public_id}"
+        return {
+            'public_id': public_id,
+            'version': 1,
+            'format': 'pdf',
+            'type': options.get('type') or 'upload',
+            'resource_type': resource_type,
+            'url': url.replace('https://', 'http://'),
+            'secure_url': url,
+        }
+
+    def destroy(self, public_id, **options):
+        if self.latency:
+            time.sleep(self.latency)
+        self.destroyed.append(public_id)
+        return {'result': 'ok'}
+
+    def __enter__(self):
+        for patcher in self._patchers:
+            patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for patcher in self._patchers:
+            patcher.stop()
+
+
+class FakeBrevo:
+    """Local stand-in for Brevo's TransactionalEmailsApi; sent messages are kept in ``outbox``"""
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+        self.outbox = []
+        self._patcher = mock.patch(
+            'sib_api_v3_sdk.TransactionalEmailsApi.send_transac_email', self.make_send()
+        )
+
+    def make_send(self):
+        fake = self
+
+        def send_transac_email(api, send_smtp_email, **kwargs):
+            if fake.latency:
+                time.sleep(fake.latency)
+            fake.outbox.append(send_smtp_email)
+            return {'messageId': f'<fake-{len(fake.outbox)}@brevo.local>'}
+        return send_transac_email
+
+    def __enter__(self):
+        self._patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._patcher.stop()
+
+
+@contextlib.contextmanager
+def external_service_fakes(firebase_latency_ms=0, cloudinary_latency_ms=0, brevo_latency_ms=0):
+    """Firebase, Cloudinary and Brevo fakes together; yields them as a dict"""
+    with FakeFirebaseAuth(firebase_latency_ms) as firebase, \
+            FakeCloudinary(cloudinary_latency_ms) as cloudinary, \
+            FakeBrevo(brevo_latency_ms) as brevo:
+        yield {'firebase': firebase, 'cloudinary': cloudinary, 'brevo': brevo}
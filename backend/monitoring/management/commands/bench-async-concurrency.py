@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from accounts.models import Engineer
+from monitoring.fakes import FakeFirebaseAuth, make_fake_token
+
+ENDPOINTS = {
+    'profile': ('/api/accounts/profile/', '/api/accounts/async/profile/'),
+    'summary': ('/api/compliance/cpd-summary/', '/api/compliance/async/cpd-summary/'),
+    'activities': ('/api/compliance/cpd-activities/', '/api/compliance/async/cpd-activities/'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare sync and async views under the ASGI handler with a slow local Firebase stub'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=ENDPOINTS, default='profile')
+        parser.add_argument('--requests', type=int, default=50, help='Concurrent requests per run')
+        parser.add_argument('--latency-ms', type=int, default=100, help='Simulated token verification latency')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            engineer = Engineer.objects.create_user(
+                'bench@example.com',
+                first_name='Bench',
+                last_name='Engineer',
+                firebase_uid='bench-uid'
+            )
+            token = make_fake_token(engineer)
+
+            self.stdout.write(
+                f"{options['requests']} concurrent requests, {options['latency_ms']} ms verification latency, "
+                f"{settings.BLOCKING_IO_MAX_WORKERS} blocking I/O workers"
+            )
+            with FakeFirebaseAuth(latency_ms=options['latency_ms']):
+                for mode, path in zip(('sync', 'async'), ENDPOINTS[options['endpoint']]):
+                    wall, latencies = asyncio.run(self.run_concurrently(path, token, options['requests']))
+                    latencies.sort()
+                    self.stdout.write(
+                        f"  {mode:<5} {path:<40} wall {wall * 1000:8.0f} ms  "
+                        f"throughput {len(latencies) / wall:7.1f} req/s  "
+                        f"p50 {latencies[len(latencies) // 2] * 1000:7.0f} ms  "
+                        f"max {latencies[-1] * 1000:7.0f} ms"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    async def run_concurrently(self, path, token, count):
+        async def one_request():
+            client = AsyncClient()
+            started = time.perf_counter()
+            response = await client.get(path, headers={'Authorization': f'Bearer {token}'})
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.content[:200]}")
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*[one_request() for _ in range(count)])
+        return time.perf_counter() - started, list(latencies)
@@ -0,0 +1,271 @@
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ProComply.cache import bump_engineer_generation
+from accounts.models import Engineer, UserProfile
+from compliance import rules
+from compliance.models import CPDActivity, approved_totals
+from compliance.snapshots import refresh_snapshot
+from monitoring.fakes import external_service_fakes, make_fake_token
+
+# name -> (method, path); create and sync write, the rest read
+ENDPOINTS = {
+    'activities': ('GET', '/api/compliance/cpd-activities/'),
+    'create': ('POST', '/api/compliance/cpd-activities/'),
+    'summary': ('GET', '/api/compliance/cpd-summary/'),
+    'report': ('GET', '/api/compliance/cpd-report/'),
+    'profile': ('GET', '/api/accounts/profile/'),
+    'sync': ('POST', '/api/accounts/sync-firebase/'),
+}
+
+# Throttles stay in the request path, but never trip during a run
+UNLIMITED_RATE = '1000000000/s'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class QueryCounter:
+    """Counts statements on a connection without DEBUG's query log"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the HTTP routes end to end against a test database, with local fakes '
+        'for Firebase, Cloudinary and Brevo. Writes p50/p95/p99, throughput and queries '
+        'per request to a JSON file for run-to-run comparison.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated activity counts for the benchmark engineer')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help=f"Subset of {', '.join(ENDPOINTS)}")
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint and size')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--cold', action='store_true', help="Invalidate the engineer's cache before every request")
+        parser.add_argument('--upload', action='store_true', help='Attach a supporting document to created activities')
+        parser.add_argument('--background-engineers', type=int, default=0, help='Other engineers generated to grow the tables')
+        parser.add_argument('--firebase-latency-ms', type=int, default=0)
+        parser.add_argument('--cloudinary-latency-ms', type=int, default=0)
+        parser.add_argument('--brevo-latency-ms', type=int, default=0)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Results file (default: benchmarks/bench-http-<timestamp>.json)')
+        parser.add_argument('--compare', help='Earlier results file to print p95 and query deltas against')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        endpoints = options['endpoints'].split(',')
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        self.rng = random.Random(options['seed'])
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {scope: UNLIMITED_RATE for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']},
+        }
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # Per-request info logging would be part of every timing
+        logging.disable(logging.INFO)
+        try:
+            with override_settings(REST_FRAMEWORK=rest_framework), external_service_fakes(
+                options['firebase_latency_ms'], options['cloudinary_latency_ms'], options['brevo_latency_ms']
+            ):
+                results = self.run(sizes, endpoints, options)
+        finally:
+            logging.disable(logging.NOTSET)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': self.git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'options': {name: options[name] for name in (
+                'sizes', 'endpoints', 'requests', 'warmup', 'cold', 'upload', 'background_engineers',
+                'firebase_latency_ms', 'cloudinary_latency_ms', 'brevo_latency_ms', 'seed',
+            )},
+            'results': results,
+        }
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', f"bench-http-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as results_file:
+            json.dump(report, results_file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def run(self, sizes, endpoints, options):
+        engineer = Engineer.objects.create_user(
+            'bench@example.com', first_name='Bench', last_name='Engineer', firebase_uid='bench-uid'
+        )
+        UserProfile.objects.get_or_create(engineer=engineer)
+        if options['background_engineers']:
+            call_command(
+                'generate-synthetic-data', engineers=options['background_engineers'],
+                seed=options['seed'], skip_snapshots=True, stdout=io.StringIO()
+            )
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {make_fake_token(engineer)}')
+        counter = QueryCounter()
+        results = []
+        for size in sizes:
+            self.grow_dataset(engineer, size)
+            self.stdout.write(f"{size} activities")
+            for name in endpoints:
+                last_id = CPDActivity.objects.order_by('-id').values_list('id', flat=True).first() or 0
+                timings, queries, statuses = [], [], {}
+                for i in range(options['warmup'] + options['requests']):
+                    if options['cold']:
+                        bump_engineer_generation(engineer.pk)
+                    counter.count = 0
+                    with connection.execute_wrapper(counter):
+                        started = time.perf_counter()
+                        response = self.request(client, name, engineer, options)
+                        elapsed = time.perf_counter() - started
+                    if i < options['warmup']:
+                        continue
+                    timings.append(elapsed)
+                    queries.append(counter.count)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+                if name == 'create':
+                    # Keep later endpoints measured at the nominal size
+                    CPDActivity.objects.filter(engineer=engineer, id__gt=last_id).delete()
+
+                result = self.summarize(name, size, timings, queries, statuses)
+                results.append(result)
+                self.stdout.write(
+                    f"  {name:<11} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                    f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s  "
+                    f"{result['queries_per_request']:5.1f} queries  {statuses}"
+                )
+        return results
+
+    def request(self, client, name, engineer, options):
+        method, path = ENDPOINTS[name]
+        if name == 'create':
+            data = {
+                'title': 'Benchmark activity',
+                'description': 'Created by bench-http',
+                'activity_type': 'INFORMAL',
+                'date_completed': date.today().isoformat(),
+                'hours_spent': 1,
+            }
+            if options['upload']:
+                data['supporting_document'] = SimpleUploadedFile('certificate.pdf', b'%PDF-1.4 bench', 'application/pdf')
+                return client.post(path, data)
+            return client.post(path, data, content_type='application/json')
+        if name == 'sync':
+            payload = {'firebase_uid': engineer.firebase_uid, 'email': engineer.email, 'name': 'Bench Engineer'}
+            return client.post(path, payload, content_type='application/json')
+        return client.get(path)
+
+    def grow_dataset(self, engineer, size):
+        """Top the engineer up to ``size`` activities over the last three years, awarded as the rules would"""
+        existing = CPDActivity.objects.filter(engineer=engineer).count()
+        today = date.today()
+        years = [today.year - 2, today.year - 1, today.year]
+        totals = {year: approved_totals(engineer.pk, year) for year in years}
+        activities = []
+        for i in range(existing, size):
+            year = years[i % len(years)]
+            last_day = (today if year == today.year else date(year, 12, 31)) - date(year, 1, 1)
+            activity_type = self.rng.choice(list(rules.MAX_PDUS_PER_CATEGORY))
+            hours = self.rng.randint(1, 16)
+            status, pdus, reason = rules.evaluate(activity_type, hours, totals[year])
+            rules.apply(totals[year], activity_type, status, pdus)
+            activities.append(CPDActivity(
+                engineer=engineer,
+                title=f'Bench activity {i}',
+                description='Benchmark dataset',
+                activity_type=activity_type,
+                date_completed=date(year, 1, 1) + timedelta(days=self.rng.randint(0, last_day.days)),
+                hours_spent=hours,
+                pdu_units_awarded=pdus,
+                status=status,
+                rejection_reason=reason,
+            ))
+        CPDActivity.objects.bulk_create(activities, batch_size=2000)
+        for year in years:
+            refresh_snapshot(engineer.pk, year)
+
+    def summarize(self, name, size, timings, queries, statuses):
+        ordered = sorted(timings)
+        return {
+            'endpoint': name,
+            'method': ENDPOINTS[name][0],
+            'path': ENDPOINTS[name][1],
+            'dataset_size': size,
+            'requests': len(timings),
+            'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+            'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+            'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+            'throughput_rps': round(len(timings) / sum(timings), 1),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def compare(self, path, results):
+        with open(path) as previous_file:
+            previous = {
+                (result['endpoint'], result['dataset_size']): result
+                for result in json.load(previous_file)['results']
+            }
+        self.stdout.write(f"Compared with {path}:")
+        for result in results:
+            before = previous.get((result['endpoint'], result['dataset_size']))
+            if before is None:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+            line = (
+                f"  {result['endpoint']:<11} {result['dataset_size']:>7}  p95 {before['p95_ms']:8.2f} -> "
+                f"{result['p95_ms']:8.2f} ms ({change:+6.1f}%)  queries {before['queries_per_request']:5.1f} -> "
+                f"{result['queries_per_request']:5.1f}"
+            )
+            regressed = change > 10 or result['queries_per_request'] > before['queries_per_request']
+            self.stdout.write(self.style.WARNING(line) if regressed else line)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
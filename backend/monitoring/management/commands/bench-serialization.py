@@ -0,0 +1,81 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import Engineer
+from compliance.models import CPDActivity
+from compliance.serializers import CPDActivitySerializer, activity_rows
+from ProComply.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row cost of the ModelSerializer and values() read paths for a large activity list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N runs is reported')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            engineer = Engineer.objects.create_user('bench@example.com', first_name='Bench', last_name='Engineer')
+            self.create_activities(engineer, options['rows'])
+            queryset = CPDActivity.objects.filter(engineer=engineer)
+
+            baseline, baseline_times = self.measure(
+                lambda: CPDActivitySerializer(queryset.select_related('engineer'), many=True).data,
+                JSONRenderer(),
+                options['repeat']
+            )
+            fast, fast_times = self.measure(lambda: activity_rows(queryset), FastJSONRenderer(), options['repeat'])
+            if [dict(row) for row in baseline] != fast:
+                self.stderr.write(self.style.ERROR('Fast path output differs from CPDActivitySerializer'))
+
+            rows = options['rows']
+            self.stdout.write(f"{rows} activities, orjson {'enabled' if orjson else 'not installed'}")
+            for label, (build, render) in (('serializer + JSONRenderer', baseline_times), ('values() + FastJSONRenderer', fast_times)):
+                self.stdout.write(
+                    f"  {label:<28} build {build * 1e6 / rows:6.1f} us/row  "
+                    f"render {render * 1e6 / rows:6.1f} us/row  total {(build + render) * 1000:7.1f} ms"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"Speedup {sum(baseline_times) / sum(fast_times):.1f}x"
+            ))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def create_activities(self, engineer, count):
+        types = [code for code, label in CPDActivity.ACTIVITY_TYPE_CHOICES]
+        start = date.today() - timedelta(days=count)
+        CPDActivity.objects.bulk_create([
+            CPDActivity(
+                engineer=engineer,
+                title=f'Activity {i}',
+                description='Benchmark activity with a short description',
+                activity_type=types[i % len(types)],
+                date_completed=start + timedelta(days=i),
+                hours_spent=i % 8 + 1,
+                pdu_units_awarded=i % 8 + 1,
+                supporting_document='image/upload/v1/cpd_certificates/certificate.pdf' if i % 3 == 0 else None,
+            )
+            for i in range(count)
+        ], batch_size=2000)
+
+    def measure(self, build, renderer, repeat):
+        """Best (build seconds, render seconds) over repeat runs"""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = build()
+            built = time.perf_counter()
+            renderer.render(data)
+            times = (built - started, time.perf_counter() - built)
+            if best is None or sum(times) < sum(best):
+                best = times
+        return data, best
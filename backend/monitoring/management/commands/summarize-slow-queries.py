@@ -0,0 +1,60 @@
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Summarize captured slow queries grouped by SQL fingerprint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Only include captures from the last N hours')
+        parser.add_argument('--limit', type=int, default=10, help='Number of query groups to show')
+        parser.add_argument('--explain', action='store_true', help='Print the latest EXPLAIN plan for each group')
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG_FILE, help='Path to the slow query log')
+
+    def handle(self, *args, **options):
+        log_path = Path(options['log'])
+        since = timezone.now() - timedelta(hours=options['hours'])
+
+        # Rotated files first so the newest capture of each group wins
+        paths = sorted(log_path.parent.glob(f"{log_path.name}.*"), reverse=True) + [log_path]
+        groups = defaultdict(list)
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path) as log_file:
+                for line in log_file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if parse_datetime(record['timestamp']) >= since:
+                        groups[record['fingerprint']].append(record)
+
+        if not groups:
+            self.stdout.write(self.style.SUCCESS('No slow queries captured in this window'))
+            return
+
+        ranked = sorted(groups.values(), key=lambda records: sum(r['duration_ms'] for r in records), reverse=True)
+        for records in ranked[:options['limit']]:
+            durations = sorted(r['duration_ms'] for r in records)
+            latest = records[-1]
+
+            self.stdout.write(self.style.WARNING(
+                f"[{latest['fingerprint']}] {len(records)} captures, "
+                f"p50 {durations[len(durations) // 2]:.0f} ms, max {durations[-1]:.0f} ms, "
+                f"total {sum(durations):.0f} ms"
+            ))
+            self.stdout.write(f"  SQL: {latest['sql'][:300]}")
+            if latest['stack']:
+                self.stdout.write(f"  Call site: {latest['stack'][-1]}")
+            if options['explain'] and latest['explain']:
+                for plan_line in latest['explain'].splitlines():
+                    self.stdout.write(f"    {plan_line}")
+            self.stdout.write('')
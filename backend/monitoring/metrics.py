@@ -0,0 +1,21 @@
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+
+
+def increment(name, value=1):
+    """Bump an in-process counter"""
+    with _lock:
+        _counters[name] += value
+
+
+def get_counters():
+    with _lock:
+        return dict(_counters)
+
+
+def reset_counters():
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,159 @@
+import cProfile
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.exceptions import AuthenticationFailed
+
+from accounts.authentication import FirebaseAuthentication, aauthenticate_firebase
+from .profiling import is_profiling_requested, save_profile
+
+logger = logging.getLogger(__name__)
+
+# One profiled request at a time: Python 3.12+ refuses a second active profiler
+_profiler_lock = threading.Lock()
+
+
+class QueryCounter:
+    """Database execute wrapper that counts the queries it sees"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def start_profiler(profiler):
+    """Enable ``profiler``, or return False when another profile is running"""
+    if not _profiler_lock.acquire(blocking=False):
+        return False
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiling tool (coverage, a debugger) owns the interpreter
+        _profiler_lock.release()
+        return False
+    return True
+
+
+def stop_profiler(profiler):
+    profiler.disable()
+    _profiler_lock.release()
+
+
+def _add_query_counter(counter):
+    connection.execute_wrappers.append(counter)
+
+
+def _remove_query_counter(counter):
+    connection.execute_wrappers.remove(counter)
+
+
+class ProfilerMiddleware:
+    """
+    Profile a request with cProfile when a staff user sends the
+    ``X-Profile`` header or the ``?_profile=1`` query flag.
+
+    Requests without the flag only pay for one dict lookup, and the
+    middleware removes itself entirely when PROFILING_ENABLED is off.
+    Flagged requests from anyone but staff are served unprofiled.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not is_profiling_requested(request):
+            return self.get_response(request)
+
+        user = self._resolve_user(request)
+        if not user.is_staff:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            if not start_profiler(profiler):
+                return self.get_response(request)
+            try:
+                response = self.get_response(request)
+            finally:
+                stop_profiler(profiler)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        self._store(profiler, request, user, response, duration_ms, counter.count)
+        return response
+
+    async def __acall__(self, request):
+        if not is_profiling_requested(request):
+            return await self.get_response(request)
+
+        user = await self._aresolve_user(request)
+        if not user.is_staff:
+            return await self.get_response(request)
+
+        # ORM work runs on the request's sync_to_async thread, so count there
+        counter = QueryCounter()
+        await sync_to_async(_add_query_counter)(counter)
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            if not start_profiler(profiler):
+                return await self.get_response(request)
+            try:
+                response = await self.get_response(request)
+            finally:
+                stop_profiler(profiler)
+            duration_ms = (time.perf_counter() - started) * 1000
+        finally:
+            await sync_to_async(_remove_query_counter)(counter)
+
+        await sync_to_async(self._store)(profiler, request, user, response, duration_ms, counter.count)
+        return response
+
+    def _resolve_user(self, request):
+        """
+        The session user, or the Firebase token's user. DRF only
+        authenticates inside the view, which is too late to decide.
+        """
+        user = request.user
+        if user.is_authenticated:
+            return user
+        try:
+            result = FirebaseAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return user
+        return result[0] if result else user
+
+    async def _aresolve_user(self, request):
+        user = await request.auser()
+        if user.is_authenticated:
+            return user
+        try:
+            return await aauthenticate_firebase(request) or user
+        except AuthenticationFailed:
+            return user
+
+    def _store(self, profiler, request, user, response, duration_ms, query_count):
+        try:
+            record = save_profile(profiler, request, user, response, duration_ms, query_count)
+            response['X-Profile-Id'] = str(record.pk)
+            logger.info(f"Stored profile {record.pk} for {request.path} ({duration_ms:.0f} ms)")
+        except Exception as e:
+            logger.error(f"Failed to store request profile: {str(e)}")
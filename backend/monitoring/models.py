@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """cProfile capture of a single staff-triggered request"""
+    engineer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='request_profiles'
+    )
+
+    # Request metadata
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    query_string = models.TextField(blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+
+    # File name of the pstats dump, relative to PROFILING_DIR
+    profile_file = models.CharField(max_length=255)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
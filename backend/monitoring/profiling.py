@@ -0,0 +1,71 @@
+import io
+import os
+import pstats
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RequestProfile
+
+PROFILE_QUERY_FLAG = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+def get_profiling_dir():
+    """Directory where pstats dumps are written"""
+    path = Path(settings.PROFILING_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def is_profiling_requested(request):
+    """Cheap check for the opt-in header or query flag"""
+    return bool(request.META.get(PROFILE_HEADER)) or PROFILE_QUERY_FLAG in request.GET
+
+
+def save_profile(profiler, request, engineer, response, duration_ms, query_count):
+    """Dump profiler stats to disk and record the request metadata"""
+    file_name = f"{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(str(get_profiling_dir() / file_name))
+
+    record = RequestProfile.objects.create(
+        engineer=engineer,
+        method=request.method,
+        path=request.path[:255],
+        query_string=request.META.get('QUERY_STRING', ''),
+        status_code=response.status_code,
+        duration_ms=duration_ms,
+        query_count=query_count,
+        profile_file=file_name,
+    )
+    prune_profiles()
+    return record
+
+
+def prune_profiles():
+    """Keep only the most recent PROFILING_MAX_PROFILES captures"""
+    stale = RequestProfile.objects.order_by('-created_at')[settings.PROFILING_MAX_PROFILES:]
+    stale_ids = []
+    for profile_id, file_name in stale.values_list('id', 'profile_file'):
+        try:
+            os.remove(get_profiling_dir() / file_name)
+        except FileNotFoundError:
+            pass
+        stale_ids.append(profile_id)
+
+    if stale_ids:
+        RequestProfile.objects.filter(id__in=stale_ids).delete()
+
+
+def format_profile_stats(profile, sort='cumulative', limit=40):
+    """Render the top functions of a stored profile as text"""
+    path = get_profiling_dir() / profile.profile_file
+    if not path.exists():
+        return 'Profile file is missing.'
+
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+_writer_lock = threading.Lock()
+_writer = None
+_recorder = None
+
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint_sql(sql):
+    """Normalize literals and IN lists so similar queries group together"""
+    normalized = STRING_LITERAL_RE.sub('?', sql)
+    normalized = NUMBER_RE.sub('?', normalized)
+    normalized = IN_LIST_RE.sub('IN (...)', normalized)
+    normalized = WHITESPACE_RE.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def get_writer():
+    """Lazily build the rotating JSON-lines logger for captures"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            path = Path(settings.SLOW_QUERY_LOG_FILE)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+            writer = logging.getLogger('monitoring.slow_queries.capture')
+            writer.addHandler(handler)
+            writer.setLevel(logging.INFO)
+            writer.propagate = False
+            _writer = writer
+    return _writer
+
+
+class SlowQueryRecorder:
+    """
+    Connection execute wrapper that captures queries slower than
+    SLOW_QUERY_THRESHOLD_MS, together with their call site and EXPLAIN plan.
+
+    Captures are sampled with SLOW_QUERY_SAMPLE_RATE and limited to
+    SLOW_QUERY_MAX_PER_MINUTE per process.
+    """
+    def __init__(self):
+        self.threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+        self.sample_rate = settings.SLOW_QUERY_SAMPLE_RATE
+        self.max_per_minute = settings.SLOW_QUERY_MAX_PER_MINUTE
+        self._lock = threading.Lock()
+        self._tokens = float(self.max_per_minute)
+        self._last_refill = time.monotonic()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_state, 'capturing', False):
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if duration_ms >= self.threshold_ms and self._should_capture():
+            try:
+                self.capture(context['connection'], sql, params, many, duration_ms)
+            except Exception as e:
+                logger.error(f"Failed to capture slow query: {str(e)}")
+
+        return result
+
+    def _should_capture(self):
+        if random.random() >= self.sample_rate:
+            return False
+
+        # Token bucket refilled at max_per_minute tokens per minute
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.max_per_minute,
+                self._tokens + (now - self._last_refill) * self.max_per_minute / 60
+            )
+            self._last_refill = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def capture(self, connection, sql, params, many, duration_ms):
+        record = {
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.alias,
+            'vendor': connection.vendor,
+            'duration_ms': round(duration_ms, 2),
+            'fingerprint': fingerprint_sql(sql),
+            'sql': sql,
+            'params': [repr(p)[:200] for p in params] if params and not many else [],
+            'stack': get_call_site_stack(),
+            'explain': None if many else explain_query(connection, sql, params),
+        }
+        get_writer().info(json.dumps(record, default=str))
+
+
+def get_call_site_stack(limit=8):
+    """Project frames leading to the query, innermost last"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('slow_queries.py')
+    ]
+    return [f"{frame.filename}:{frame.lineno} in {frame.name}" for frame in frames[-limit:]]
+
+
+def explain_query(connection, sql, params):
+    """Run EXPLAIN for a captured SELECT inside a savepoint"""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+
+    _state.capturing = True
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        _state.capturing = False
+
+
+def install_recorder(sender, connection, **kwargs):
+    """connection_created receiver that attaches the shared recorder once per connection"""
+    global _recorder
+    if _recorder is None:
+        _recorder = SlowQueryRecorder()
+    if _recorder not in connection.execute_wrappers:
+        # Insert first so execute_wrapper() context managers still pop their own
+        connection.execute_wrappers.insert(0, _recorder)
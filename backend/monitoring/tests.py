@@ -0,0 +1,81 @@
+import tempfile
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from ProComply.testing import APITestCase
+from accounts.models import Engineer
+from monitoring.fakes import make_fake_token
+from .middleware import _profiler_lock
+from .models import RequestProfile
+
+
+class QueryBudgetTests(APITestCase):
+    def test_metrics(self):
+        staff = Engineer.objects.create_user('staff@example.com', firebase_uid='staff-uid', is_staff=True)
+
+        with self.assertMaxQueries(1):
+            response = self.client_for(staff).get('/api/monitoring/metrics/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ProfilerMiddlewareTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        profiling_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profiling_dir.cleanup)
+        settings_override = override_settings(PROFILING_ENABLED=True, PROFILING_DIR=profiling_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = Engineer.objects.create_user('staff@example.com', firebase_uid='staff-uid', is_staff=True)
+        self.engineer = Engineer.objects.create_user('engineer@example.com', firebase_uid='engineer-uid')
+
+    def test_staff_request_is_profiled(self):
+        response = self.client_for(self.staff).get('/api/compliance/cpd-activities/', HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.engineer, self.staff)
+        self.assertGreater(profile.query_count, 0)
+
+    def test_non_staff_request_is_not_profiled(self):
+        with mock.patch('monitoring.middleware.cProfile.Profile') as profile_class:
+            response = self.client_for(self.engineer).get('/api/compliance/cpd-activities/?_profile=1')
+
+        self.assertEqual(response.status_code, 200)
+        profile_class.assert_not_called()
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_anonymous_request_is_not_profiled(self):
+        with mock.patch('monitoring.middleware.cProfile.Profile') as profile_class:
+            response = APIClient().get('/api/compliance/cpd-activities/', HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, 401)
+        profile_class.assert_not_called()
+
+    def test_busy_profiler_serves_request_unprofiled(self):
+        with _profiler_lock:
+            response = self.client_for(self.staff).get('/api/compliance/cpd-activities/', HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_profiler_enable_error_serves_request_unprofiled(self):
+        with mock.patch('monitoring.middleware.cProfile.Profile.enable', side_effect=ValueError):
+            response = self.client_for(self.staff).get('/api/compliance/cpd-activities/', HTTP_X_PROFILE='1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(_profiler_lock.locked())
+
+    async def test_async_request_counts_queries(self):
+        response = await self.async_client.get(
+            '/api/accounts/async/profile/',
+            headers={'Authorization': f'Bearer {make_fake_token(self.staff)}', 'X-Profile': '1'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        profile = await RequestProfile.objects.aget(pk=response['X-Profile-Id'])
+        self.assertGreater(profile.query_count, 0)
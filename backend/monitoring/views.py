@@ -0,0 +1,18 @@
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from ProComply.cache import get_cache_stats
+from ProComply.routers import get_replica_status
+from . import metrics
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics_view(request):
+    """In-process counters for this worker, plus replica health"""
+    return Response({
+        'counters': metrics.get_counters(),
+        'replicas': get_replica_status(),
+        'cache': get_cache_stats(),
+    })
@@ -1,18 +1,65 @@
 import { create } from 'zustand';
 import client from '../api/client';
+import { useProfileStore } from './UseProfileStore';
 
-export const useCPDStore = create((set) => ({
+const byDateDesc = (a, b) => b.date_completed.localeCompare(a.date_completed) || b.id - a.id;
+
+// Everything here belongs to the signed-in engineer
+const initialState = {
   activities: [],
+  syncCursor: null,
   summary: null,
+  recentActivities: [],
+  activityCount: 0,
   loading: false,
   error: null,
+};
 
-  fetchActivities: async () => {
+export const useCPDStore = create((set, get) => ({
+  ...initialState,
+
+  // Profile, summary and recent activities for HomePage in one request
+  fetchDashboard: async (year = new Date().getFullYear(), recent = 5) => {
     set({ loading: true, error: null });
     try {
-      const res = await client.get('/compliance/cpd-activities/');
-      set({ activities: res.data, loading: false });
+      const res = await client.get(`/compliance/dashboard/?year=${year}&recent=${recent}`);
+      useProfileStore.setState({ profile: res.data.profile, error: null });
+      set({
+        summary: res.data.summary,
+        recentActivities: res.data.recent_activities,
+        activityCount: res.data.activity_count,
+        loading: false
+      });
       return res.data;
+    } catch (error) {
+      console.error('Fetch dashboard error:', error);
+      const message = error.response?.data?.detail || 
+                     error.response?.data?.error ||
+                     error.message ||
+                     'Failed to load dashboard';
+      set({ error: message, loading: false });
+      throw new Error(message);
+    }
+  },
+
+  // Incremental: only activities changed or deleted since the last sync are fetched
+  fetchActivities: async () => {
+    set({ loading: true, error: null });
+    try {
+      let { syncCursor: cursor, activities } = get();
+      const byId = new Map(cursor === null ? [] : activities.map((activity) => [activity.id, activity]));
+      let page;
+      do {
+        const params = cursor === null ? {} : { cursor };
+        page = (await client.get('/compliance/cpd-activities/changes/', { params })).data;
+        page.changed.forEach((activity) => byId.set(activity.id, activity));
+        page.deleted.forEach((id) => byId.delete(id));
+        cursor = page.cursor;
+      } while (page.has_more);
+
+      activities = [...byId.values()].sort(byDateDesc);
+      set({ activities, syncCursor: cursor, loading: false });
+      return activities;
     } catch (error) {
       console.error('Fetch activities error:', error);
       const message = error.response?.data?.detail || 
@@ -71,6 +118,52 @@ export const useCPDStore = create((set) => ({
     }
   },
 
+  // Edits and deletes can change the awards of later activities that year, so resync afterwards
+  updateActivity: async (id, changes) => {
+    set({ loading: true, error: null });
+    try {
+      const res = await client.patch(`/compliance/cpd-activities/${id}/`, changes);
+      await get().fetchActivities();
+      return res.data;
+    } catch (error) {
+      console.error('Update activity error:', error);
+      const message = error.response?.data?.detail || 
+                     error.response?.data?.error ||
+                     error.message ||
+                     'Failed to update activity';
+      set({ error: message, loading: false });
+      throw new Error(message);
+    }
+  },
+
+  deleteActivity: async (id) => {
+    set({ loading: true, error: null });
+    try {
+      await client.delete(`/compliance/cpd-activities/${id}/`);
+      await get().fetchActivities();
+      return true;
+    } catch (error) {
+      console.error('Delete activity error:', error);
+      const message = error.response?.data?.detail || 
+                     error.response?.data?.error ||
+                     error.message ||
+                     'Failed to delete activity';
+      set({ error: message, loading: false });
+      throw new Error(message);
+    }
+  },
+
+  // What-if: awards planned activities would get, nothing is saved
+  simulateActivities: async (plannedActivities) => {
+    try {
+      const res = await client.post('/compliance/cpd-activities/simulate/', plannedActivities);
+      return res.data;
+    } catch (error) {
+      console.error('Simulate activities error:', error);
+      throw new Error(error.response?.data?.error || 'Failed to simulate activities');
+    }
+  },
+
   downloadReport: async (year = new Date().getFullYear()) => {
     try {
       const response = await client.get(`/compliance/cpd-report/?year=${year}`, {
@@ -95,4 +188,7 @@ export const useCPDStore = create((set) => ({
   },
 
   clearError: () => set({ error: null }),
+
+  // Drop the previous user's activities and sync cursor on logout or user change
+  reset: () => set(initialState),
 }));
\ No newline at end of file
@@ -9,6 +9,8 @@ import {
 } from 'firebase/auth';
 import { auth } from '../lib/firebase'; 
 import client from '../api/client';
+import { useCPDStore } from './UseCPDStore';
+import { useProfileStore } from './UseProfileStore';
 
 export const useAuthstore = create((set) => ({
   user: null,
@@ -124,4 +126,13 @@ export const useAuthstore = create((set) => ({
   },
 
   clearError: () => set({ error: null })
-}));
\ No newline at end of file
+}));
+
+// The CPD and profile stores hold the signed-in user's data; drop it on
+// logout or when a different user signs in on the same tab
+useAuthstore.subscribe((state, previous) => {
+  if (state.user?.uid !== previous.user?.uid) {
+    useCPDStore.getState().reset();
+    useProfileStore.getState().clearProfile();
+  }
+});
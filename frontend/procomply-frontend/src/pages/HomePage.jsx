@@ -15,28 +15,21 @@ import {
 
 export default function HomePage() {
   const navigate = useNavigate();
-  const { profile, loading: profileLoading, error: profileError, fetchProfile } = useProfileStore();
+  const { profile, loading: profileLoading, error: profileError } = useProfileStore();
   const { 
-    activities, 
     summary, 
+    recentActivities,
+    activityCount,
     loading: cpdLoading, 
     error: cpdError, 
-    fetchActivities, 
-    fetchSummary 
+    fetchDashboard 
   } = useCPDStore();
   
   const [selectedYear, setSelectedYear] = useState(new Date().getFullYear());
 
   useEffect(() => {
-    if (!profile && !profileLoading) {
-      fetchProfile();
-    }
-  }, [profile, profileLoading, fetchProfile]);
-
-  useEffect(() => {
-    fetchActivities();
-    fetchSummary(selectedYear);
-  }, [selectedYear, fetchActivities, fetchSummary]);
+    fetchDashboard(selectedYear).catch(() => {});
+  }, [selectedYear, fetchDashboard]);
 
   if (profileLoading || cpdLoading) {
     return (
@@ -53,7 +46,7 @@ export default function HomePage() {
     return (
       <div className="p-8 text-center">
         <div className="bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded mb-4">
-          {profileError || 'Session expired. Please log in again.'}
+          {profileError || cpdError || 'Session expired. Please log in again.'}
         </div>
         <button
           onClick={() => navigate('/login')}
@@ -65,9 +58,6 @@ export default function HomePage() {
     );
   }
 
-  // Recent activities (last 5)
-  const recentActivities = activities.slice(0, 5);
-
   // Calculate progress percentage
   const progressPercentage = summary 
     ? Math.min((summary.total_pdus_earned / summary.total_pdus_required) * 100, 100)
@@ -92,7 +82,7 @@ export default function HomePage() {
     },
     {
       title: 'Activities Logged',
-      value: activities.length,
+      value: activityCount,
       subtitle: 'this year',
       icon: FileText,
       color: 'bg-purple-500',